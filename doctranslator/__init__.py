@@ -0,0 +1,13 @@
+"""多语言 Word 文档翻译器
+
+图形界面位于 doctranslator.gui，仅在需要时导入，因此本包可在没有 tkinter 的环境中使用。
+"""
+from .cache import SegmentCache, PROMPT_VERSION
+from .backends import TranslationBackend, OpenAIBackend, FakeBackend, BackendError
+from .translator import DocTranslator, SUPPORTED_LANGUAGES
+from .glossary import Glossary, load_glossaries
+from .engine import TranslationEngine
+from .processor import DocumentProcessor
+from .pipeline import TranslationPipeline, get_unique_filename, get_cache_dir, clean_cache
+
+__version__ = "1.0.0"
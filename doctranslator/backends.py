@@ -0,0 +1,248 @@
+"""翻译后端：OpenAI 兼容的 HTTP 接口，以及用于离线压测的进程内模拟后端
+
+后端只负责发送一次对话请求并返回文本，重试、限流和缓存由 DocTranslator 处理。
+请求失败时抛出带 status_code（以及可选的 Retry-After 响应头）的异常。
+"""
+import os
+import re
+import json
+import time
+import random
+import threading
+
+from .concurrency import default_workers
+from .packer import estimate_tokens
+
+def _env_float(name, default=None):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return float(value)
+
+def _env_int(name, default=None):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+class BackendError(Exception):
+    """后端返回的错误，字段与 openai 的 APIStatusError 一致，便于统一处理"""
+    def __init__(self, message, status_code=None, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class TranslationBackend:
+    """翻译后端接口"""
+    model = None
+
+    def complete(self, messages):
+        """发送一次请求，返回完整的回复文本"""
+        raise NotImplementedError
+
+    def stream(self, messages):
+        """发送一次流式请求，逐段返回回复文本；默认不分段"""
+        yield self.complete(messages)
+
+def _http2_enabled():
+    """HTTP2=auto（默认）时，安装了 h2 才启用 HTTP/2"""
+    setting = os.getenv('HTTP2', 'auto').lower()
+    if setting in ('false', '0', 'no'):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        if setting != 'auto':
+            print("未安装 h2，HTTP/2 不可用，使用 HTTP/1.1（pip install httpx[http2]）")
+        return False
+    return True
+
+def create_http_client(max_connections):
+    """创建所有 API key 共用的 HTTP 连接池
+
+    连接数与并发请求数一致，空闲连接保持 HTTP_KEEPALIVE_EXPIRY 秒以便复用；
+    连接和读取超时（HTTP_CONNECT_TIMEOUT、HTTP_READ_TIMEOUT）保证慢请求不会无限挂起。
+    无法导入 httpx 时返回 None，由 openai 使用默认设置。
+    """
+    try:
+        import httpx
+    except ImportError:
+        return None
+    max_connections = max(1, max_connections)
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30'))
+    )
+    timeout = httpx.Timeout(
+        float(os.getenv('HTTP_READ_TIMEOUT', '120')),
+        connect=float(os.getenv('HTTP_CONNECT_TIMEOUT', '10'))
+    )
+    return httpx.Client(http2=_http2_enabled(), limits=limits, timeout=timeout)
+
+class OpenAIBackend(TranslationBackend):
+    """OpenAI 兼容的 HTTP 接口（DeepSeek、OpenAI、本地推理服务等）
+
+    地址、模型和采样参数默认来自 API_BASE_URL、MODEL、TEMPERATURE、TOP_P、MAX_TOKENS。
+    http_client 为共用的连接池（见 create_http_client）；重试由 DocTranslator 负责，
+    因此关闭 openai 自带的重试，避免重试次数叠加。
+    """
+    def __init__(self, api_key, base_url=None, model=None, temperature=None, top_p=None, max_tokens=None,
+                 http_client=None):
+        # 延迟导入，使模拟后端无需安装 openai
+        from openai import OpenAI
+
+        self.base_url = base_url or os.getenv('API_BASE_URL', 'https://api.deepseek.com')
+        self.model = model or os.getenv('MODEL', 'deepseek-chat')
+        self.temperature = temperature if temperature is not None else _env_float('TEMPERATURE', 1.3)
+        self.top_p = top_p if top_p is not None else _env_float('TOP_P')
+        if max_tokens is None and os.getenv('MAX_TOKENS'):
+            max_tokens = int(os.getenv('MAX_TOKENS'))
+        self.max_tokens = max_tokens
+        options = {"api_key": api_key, "base_url": self.base_url, "max_retries": 0}
+        if http_client is not None:
+            options["http_client"] = http_client
+        else:
+            options["timeout"] = float(os.getenv('HTTP_READ_TIMEOUT', '120'))
+        self.client = OpenAI(**options)
+
+    def _params(self, messages):
+        params = {"model": self.model, "messages": messages, "temperature": self.temperature}
+        if self.top_p is not None:
+            params["top_p"] = self.top_p
+        if self.max_tokens is not None:
+            params["max_tokens"] = self.max_tokens
+        return params
+
+    def complete(self, messages):
+        completion = self.client.chat.completions.create(**self._params(messages))
+        return completion.choices[0].message.content
+
+    def stream(self, messages):
+        for chunk in self.client.chat.completions.create(stream=True, **self._params(messages)):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+class FakeBackend(TranslationBackend):
+    """进程内的模拟后端：按配置的延迟、错误率和 429 比例返回确定性的“译文”
+
+    译文为 "[目标语言] 原文"，批量请求按协议返回 JSON 数组。
+    同一 seed 下错误和速率限制出现的位置固定，可重现限流场景。
+    默认参数来自 FAKE_LATENCY、FAKE_LATENCY_PER_TOKEN、FAKE_ERROR_RATE、
+    FAKE_RATE_LIMIT_RATE、FAKE_RETRY_AFTER、FAKE_SEED。
+    """
+    model = "fake"
+
+    def __init__(self, latency=None, latency_per_token=None, error_rate=None,
+                 rate_limit_rate=None, retry_after=None, seed=None):
+        self.latency = latency if latency is not None else _env_float('FAKE_LATENCY', 0.2)
+        self.latency_per_token = (latency_per_token if latency_per_token is not None
+                                  else _env_float('FAKE_LATENCY_PER_TOKEN', 0.0))
+        self.error_rate = error_rate if error_rate is not None else _env_float('FAKE_ERROR_RATE', 0.0)
+        self.rate_limit_rate = (rate_limit_rate if rate_limit_rate is not None
+                                else _env_float('FAKE_RATE_LIMIT_RATE', 0.0))
+        self.retry_after = retry_after if retry_after is not None else _env_float('FAKE_RETRY_AFTER', 1.0)
+        if seed is None:
+            seed = _env_int('FAKE_SEED')
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # 调用统计，供压测报告使用
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    @staticmethod
+    def translate(text, target_language):
+        """确定性的“翻译”"""
+        return f"[{target_language}] {text}"
+
+    def _reply(self, messages):
+        system = messages[0]["content"]
+        match = re.search(r"Translate the text to (.+?) without", system)
+        target_language = match.group(1) if match else "?"
+        # 提示词格式为 "说明：\n\n原文"
+        text = messages[-1]["content"].split("\n\n", 1)[-1]
+        if text.startswith("[") and '"id"' in system:
+            try:
+                items = json.loads(text)
+                return json.dumps(
+                    [{"id": item["id"], "text": self.translate(item["text"], target_language)} for item in items],
+                    ensure_ascii=False
+                )
+            except (ValueError, KeyError, TypeError):
+                pass
+        return self.translate(text, target_language)
+
+    def _call(self, messages):
+        """模拟一次请求的延迟和失败，返回回复文本"""
+        input_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self.rate_limited += 1
+            time.sleep(self.latency / 10)
+            raise BackendError("Rate limit exceeded", 429, {"retry-after": str(self.retry_after)})
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.errors += 1
+            time.sleep(self.latency)
+            raise BackendError("Service unavailable", 503)
+
+        reply = self._reply(messages)
+        output_tokens = estimate_tokens(reply)
+        with self._lock:
+            self.output_tokens += output_tokens
+        time.sleep(self.latency + self.latency_per_token * output_tokens)
+        return reply
+
+    def complete(self, messages):
+        return self._call(messages)
+
+    def stream(self, messages):
+        reply = self._call(messages)
+        for start in range(0, len(reply), 32):
+            yield reply[start:start + 32]
+
+def load_api_keys():
+    """从环境变量 X_AI_API_KEY_1、X_AI_API_KEY_2 … 读取所有 API key"""
+    keys = []
+    i = 1
+    while True:
+        key = os.getenv(f'X_AI_API_KEY_{i}')
+        if not key:
+            break
+        keys.append(key)
+        i += 1
+    return keys
+
+def create_backends(name=None, concurrency=None, mode=None):
+    """按 TRANSLATION_BACKEND（openai 或 fake）创建后端列表，每个后端对应一个 API key
+
+    concurrency 为同时进行的请求总数，决定共用连接池的大小；默认与使用 mode 并发模式
+    （未指定时读取 CONCURRENCY_MODE）的 TranslationEngine 的线程数一致，见 default_workers。
+    """
+    name = (name or os.getenv('TRANSLATION_BACKEND', 'openai')).lower()
+    if name == 'fake':
+        count = max(1, _env_int('FAKE_KEY_COUNT', 1))
+        seed = _env_int('FAKE_SEED')
+        return [
+            FakeBackend(seed=None if seed is None else seed + i)
+            for i in range(count)
+        ]
+    if name != 'openai':
+        raise ValueError(f"未知的翻译后端: {name}")
+    api_keys = load_api_keys()
+    if not api_keys:
+        raise ValueError("未找到 API key，请在 .env 文件中设置 X_AI_API_KEY_1, X_AI_API_KEY_2 等")
+    if concurrency is None:
+        concurrency = default_workers(len(api_keys), mode)
+    http_client = create_http_client(concurrency)
+    return [OpenAIBackend(key, http_client=http_client) for key in api_keys]
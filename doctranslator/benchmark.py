@@ -0,0 +1,223 @@
+"""性能基准：生成合成文档，用模拟后端跑完整流程，报告吞吐量、API 调用次数、token 数、内存峰值和各阶段耗时
+
+用法：
+    python -m doctranslator.benchmark --paragraphs 2000 --tables 20 --latency 0.2
+    python -m doctranslator.benchmark --json results.jsonl   # 追加一行结果，便于比较不同版本
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from docx import Document
+
+from . import __version__
+from .backends import FakeBackend
+from .engine import TranslationEngine
+from .index import build_segment_index
+from .pipeline import TranslationPipeline
+from .ratelimit import RateLimiter
+from .translator import DocTranslator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+WORDS = (
+    "system data report value process result analysis design quality service customer "
+    "project market product control method review policy budget schedule contract "
+    "delivery support network security document version change request approval"
+).split()
+
+BOILERPLATE = [
+    "N/A",
+    "Confidential - for internal use only",
+    "See appendix for details.",
+    "All rights reserved.",
+    "Total",
+    "Approved by the project committee.",
+]
+
+def _sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 30))]
+    return " ".join(words).capitalize() + "."
+
+def _text(rng, boilerplate_ratio):
+    if rng.random() < boilerplate_ratio:
+        return rng.choice(BOILERPLATE)
+    return _sentence(rng)
+
+def generate_document(path, paragraphs=500, tables=5, rows=10, cols=4,
+                      headers=True, boilerplate_ratio=0.2, seed=0):
+    """生成合成文档：paragraphs 个段落、tables 个 rows×cols 的表格、页眉页脚，
+    boilerplate_ratio 为重复模板文本所占的比例"""
+    rng = random.Random(seed)
+    doc = Document()
+    if headers:
+        section = doc.sections[0]
+        section.header.paragraphs[0].text = "Quarterly report - " + _sentence(rng)
+        section.footer.paragraphs[0].text = rng.choice(BOILERPLATE)
+
+    # 表格均匀插在段落之间
+    table_every = paragraphs // tables if tables else 0
+    table_count = 0
+    for i in range(paragraphs):
+        doc.add_paragraph(_text(rng, boilerplate_ratio))
+        if table_every and (i + 1) % table_every == 0 and table_count < tables:
+            table = doc.add_table(rows=rows, cols=cols)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = _text(rng, boilerplate_ratio)
+            table_count += 1
+    doc.save(path)
+    return path
+
+def peak_rss_mb():
+    """进程的内存峰值（MB），无法获取时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_benchmark(file_path, target_language="Chinese", keys=2, workers=None,
+                  latency=0.2, latency_per_token=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                  seed=0, in_place=True, requests_per_hour=None):
+    """用模拟后端翻译 file_path，返回各项指标（不使用翻译记忆）
+
+    requests_per_hour 为每个 key 的限速，None 表示不限速，只测量流程本身的开销。
+    """
+    backends = [
+        FakeBackend(latency=latency, latency_per_token=latency_per_token, error_rate=error_rate,
+                    rate_limit_rate=rate_limit_rate, retry_after=latency, seed=seed + i)
+        for i in range(keys)
+    ]
+    translator = DocTranslator(cache=False, backends=backends)
+    translator.rate_limiter = RateLimiter(
+        keys, requests_per_hour=requests_per_hour or 3.6e9, burst=None if requests_per_hour else 1e6
+    )
+    engine = TranslationEngine(translator, max_workers=workers)
+    pipeline = TranslationPipeline(translator, engine=engine, in_place=in_place)
+    output_dir = tempfile.mkdtemp(prefix="doctranslator-bench-")
+
+    stages = {}
+    start = time.perf_counter()
+    doc = Document(file_path)
+    stages['parse'] = time.perf_counter() - start
+
+    mark = time.perf_counter()
+    index = build_segment_index(doc)
+    stages['index'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    job = pipeline.prepare(file_path, target_language, output_dir=output_dir, loaded=(doc, index))
+    stages['prepare'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    pipeline._dispatch([job])
+    stages['translate'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    output_path = pipeline.finish(job)
+    stages['write'] = time.perf_counter() - mark
+    total = time.perf_counter() - start
+    engine.close()
+
+    calls = sum(backend.calls for backend in backends)
+    os.remove(output_path)
+    os.rmdir(output_dir)
+    return {
+        "version": __version__,
+        "segments": len(index),
+        "unique_segments": len(job.texts),
+        "api_calls": calls,
+        "segments_per_call": len(job.texts) / calls if calls else 0.0,
+        "rate_limited": sum(backend.rate_limited for backend in backends),
+        "errors": sum(backend.errors for backend in backends),
+        "input_tokens": sum(backend.input_tokens for backend in backends),
+        "output_tokens": sum(backend.output_tokens for backend in backends),
+        "seconds": total,
+        "segments_per_second": len(index) / total if total else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+    }
+
+def format_report(result):
+    lines = [
+        f"片段数:         {result['segments']}（去重后 {result['unique_segments']}）",
+        f"API 调用:       {result['api_calls']}（平均每次 {result['segments_per_call']:.1f} 个片段，"
+        f"429 {result['rate_limited']} 次，错误 {result['errors']} 次）",
+        f"token:          输入 {result['input_tokens']}，输出 {result['output_tokens']}",
+        f"总耗时:         {result['seconds']:.2f} 秒（{result['segments_per_second']:.1f} 片段/秒）",
+    ]
+    if result['peak_rss_mb'] is not None:
+        lines.append(f"内存峰值:       {result['peak_rss_mb']:.1f} MB")
+    lines.append("各阶段耗时:")
+    for stage, seconds in result['stages'].items():
+        lines.append(f"  {stage:<12}{seconds:.3f} 秒")
+    return "\n".join(lines)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m doctranslator.benchmark",
+        description="用合成文档和模拟后端测量翻译流程的性能"
+    )
+    parser.add_argument("--input", help="使用已有的 .docx 文件，而不是生成合成文档")
+    parser.add_argument("--paragraphs", type=int, default=500, help="段落数（默认 500）")
+    parser.add_argument("--tables", type=int, default=5, help="表格数（默认 5）")
+    parser.add_argument("--rows", type=int, default=10, help="每个表格的行数（默认 10）")
+    parser.add_argument("--cols", type=int, default=4, help="每个表格的列数（默认 4）")
+    parser.add_argument("--no-headers", action="store_true", help="不生成页眉页脚")
+    parser.add_argument("--boilerplate", type=float, default=0.2,
+                        help="重复模板文本的比例，0~1（默认 0.2）")
+    parser.add_argument("--lang", default="Chinese", help="目标语言（默认 Chinese）")
+    parser.add_argument("--keys", type=int, default=2, help="模拟的 API key 数（默认 2）")
+    parser.add_argument("--workers", type=int, help="同时发送的请求数（默认每个 key 2 个）")
+    parser.add_argument("--latency", type=float, default=0.2, help="每个请求的模拟延迟，秒（默认 0.2）")
+    parser.add_argument("--latency-per-token", type=float, default=0.0, help="每个输出 token 增加的延迟，秒")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="请求失败的比例")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="返回 429 的比例")
+    parser.add_argument("--requests-per-hour", type=float,
+                        help="每个 key 每小时的请求上限（默认不限速）")
+    parser.add_argument("--rebuild", action="store_true", help="使用重建模式写出文档")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（默认 0）")
+    parser.add_argument("--json", metavar="PATH", help="把结果作为一行 JSON 追加到文件")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    generated = None
+    file_path = args.input
+    if file_path is None:
+        handle, generated = tempfile.mkstemp(suffix=".docx", prefix="doctranslator-bench-")
+        os.close(handle)
+        generate_document(generated, args.paragraphs, args.tables, args.rows, args.cols,
+                          not args.no_headers, args.boilerplate, args.seed)
+        file_path = generated
+
+    try:
+        result = run_benchmark(
+            file_path, args.lang, args.keys, args.workers, args.latency, args.latency_per_token,
+            args.error_rate, args.rate_limit_rate, args.seed, in_place=not args.rebuild,
+            requests_per_hour=args.requests_per_hour
+        )
+    finally:
+        if generated:
+            os.remove(generated)
+
+    result["document"] = args.input or {
+        "paragraphs": args.paragraphs, "tables": args.tables, "rows": args.rows, "cols": args.cols,
+        "headers": not args.no_headers, "boilerplate": args.boilerplate, "seed": args.seed,
+    }
+    print(format_report(result))
+    if args.json:
+        with open(args.json, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
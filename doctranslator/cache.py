@@ -0,0 +1,166 @@
+import os
+import re
+import time
+import threading
+import hashlib
+import sqlite3
+import unicodedata
+
+from .metrics import metrics
+
+# 提示词版本，修改 DocTranslator._request 或批量请求说明中的提示词时需要递增，使旧的翻译记忆失效
+PROMPT_VERSION = 2
+
+# 写入攒够这么多条或距上次提交超过这么多秒时才提交一次事务
+COMMIT_EVERY = 200
+COMMIT_INTERVAL = 2.0
+
+class SegmentCache:
+    """持久化翻译记忆：以原文、目标语言、模型和提示词版本的哈希为键保存译文
+
+    命中时只在内存中记下最近使用的键，与新译文一起批量提交，查询不产生写事务；
+    数据库使用 WAL 日志，提交不阻塞读取。未提交的写入由 flush() 或 close() 落盘，
+    即使进程意外退出，丢失的也只是最近几秒的翻译记忆（译文本身已写入翻译日志）。
+    """
+    def __init__(self, db_path=None, max_entries=None, max_age_days=None):
+        if db_path is None:
+            # 不能放在 .translation_cache 中：主目录下文档的缓存目录也是 ~/.translation_cache，清理缓存时会被删除
+            db_path = os.getenv(
+                'TRANSLATION_MEMORY_PATH',
+                os.path.join(os.path.expanduser("~"), ".doctranslator", "translation_memory.db")
+            )
+        if max_entries is None:
+            max_entries = int(os.getenv('TRANSLATION_MEMORY_MAX_ENTRIES', '200000'))
+        if max_age_days is None:
+            max_age_days = float(os.getenv('TRANSLATION_MEMORY_MAX_AGE_DAYS', '180'))
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = 0
+        self._touched = {}       # 命中但尚未写回的键 -> 最近使用时间
+        self._pending = 0        # 未提交的写入数
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(db_path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        # 翻译引擎会在多个线程中访问同一个连接，由 _lock 保证串行
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError:
+            # 网络文件系统等不支持 WAL 时沿用默认日志模式
+            pass
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_segments_last_used ON segments (last_used)")
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def normalize(text):
+        """规范化原文：统一 Unicode 形式，去掉首尾空白并合并连续的空格
+
+        制表符和换行会原样写回文档，不能合并，否则 "A\tB" 和 "A B" 会共用同一个译文。
+        """
+        text = unicodedata.normalize('NFC', text).strip()
+        return re.sub(r' {2,}', ' ', text)
+
+    @staticmethod
+    def text_hash(text):
+        """规范化原文的哈希，与文档片段索引中的 hash 一致"""
+        return hashlib.sha256(SegmentCache.normalize(text).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(text, target_language, model):
+        raw = f"{PROMPT_VERSION}\0{model}\0{target_language}\0{SegmentCache.text_hash(text)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, text, target_language, model):
+        """查询译文，未命中时返回 None"""
+        key = self.make_key(text, target_language, model)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation FROM segments WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                metrics.inc('cache_misses')
+                return None
+            self.hits += 1
+            metrics.inc('cache_hits')
+            # 最近使用时间用于 LRU 淘汰，下次提交时批量写回
+            self._touched[key] = time.time()
+            return row[0]
+
+    def put(self, text, target_language, model, translation):
+        """保存译文"""
+        key = self.make_key(text, target_language, model)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO segments (key, translation, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, translation, now, now)
+            )
+            self._touched.pop(key, None)
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY or time.monotonic() - self._last_commit >= COMMIT_INTERVAL:
+                self._commit()
+            self._writes_since_evict += 1
+            should_evict = self._writes_since_evict >= 100
+        if should_evict:
+            self.evict()
+
+    def _commit(self):
+        """写回命中记录的最近使用时间并提交（调用方持有 _lock）"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE segments SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._touched.clear()
+        self._conn.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def flush(self):
+        """提交所有未写入的更改"""
+        with self._lock:
+            self._commit()
+
+    def evict(self):
+        """删除过期条目，并按最近使用时间淘汰超出数量上限的条目"""
+        with self._lock:
+            self._commit()
+            self._writes_since_evict = 0
+            if self.max_age_days > 0:
+                cutoff = time.time() - self.max_age_days * 86400
+                self._conn.execute("DELETE FROM segments WHERE last_used < ?", (cutoff,))
+            if self.max_entries > 0:
+                count = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+                if count > self.max_entries:
+                    self._conn.execute(
+                        "DELETE FROM segments WHERE key IN "
+                        "(SELECT key FROM segments ORDER BY last_used ASC LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+            self._conn.commit()
+
+    def clear(self):
+        """清空翻译记忆"""
+        with self._lock:
+            self._conn.execute("DELETE FROM segments")
+            self._touched.clear()
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
@@ -0,0 +1,156 @@
+"""发送前判断片段是否需要翻译：数字、符号、编号、网址，以及已经是目标语言的文本原样保留
+
+只做廉价的字符级判断，宁可多翻译也不误跳过：无法确定时一律返回需要翻译。
+"""
+import re
+import unicodedata
+
+URL_RE = re.compile(r'^(?:[a-z][a-z0-9+.\-]*://|www\.)\S+$', re.IGNORECASE)
+EMAIL_RE = re.compile(r'^[\w.+\-]+@[\w\-]+(?:\.[\w\-]+)+$')
+PATH_RE = re.compile(r'^(?:[a-zA-Z]:)?[\\/](?:[^\\/\s]+[\\/])*[^\\/\s]*$')
+# 零件号、版本号、标识符等：单个不含空格的记号
+CODE_RE = re.compile(r'^[A-Za-z0-9_.\-/#:+]+$')
+LETTER_RUN_RE = re.compile(r'[A-Za-z]+')
+
+# 目标语言 -> 该语言使用的文字
+SCRIPT_LANGUAGES = {
+    "Chinese": "han",
+    "Traditional Chinese": "han",
+    "Japanese": "kana",
+    "Korean": "hangul",
+    "Russian": "cyrillic",
+}
+
+# 拉丁字母语言的常见虚词，用于区分英语、西班牙语等
+STOPWORDS = {
+    "English": {"the", "and", "of", "to", "is", "in", "for", "with", "that", "this", "are", "be", "on",
+                "by", "as", "it", "or", "from", "an", "will", "shall", "not", "at", "which"},
+    "Spanish": {"el", "la", "los", "las", "de", "del", "y", "que", "en", "un", "una", "es", "por", "con",
+                "para", "se", "al", "no", "como", "más", "su"},
+    "French": {"le", "la", "les", "de", "des", "du", "et", "est", "un", "une", "que", "en", "pour", "dans",
+               "sur", "par", "au", "aux", "avec", "ne", "pas", "qui"},
+    "German": {"der", "die", "das", "und", "ist", "nicht", "ein", "eine", "zu", "den", "von", "mit",
+               "für", "auf", "im", "dem", "des", "sich", "sind", "wird", "werden"},
+    "Italian": {"il", "lo", "la", "gli", "le", "di", "del", "della", "e", "che", "è", "un", "una",
+                "per", "con", "non", "sono", "nel", "alla", "dei"},
+}
+
+# 简体字与繁体字写法不同的常用字，两两成对（简体在前）；
+# 只收录一一对应、且简体字不会出现在繁体文本中的字
+VARIANT_PAIRS = (
+    "简簡体體这這个個们們来來时時为為说說国國会會对對发發过過还還没沒动動经經现現样樣开開关關"
+    "长長门門问問间間东東车車书書学學见見请請让讓话話认認识識语語读讀写寫电電脑腦网網络絡页頁"
+    "题題务務业業产產实實际際应應该該给給终終结結统統计計设設备備数數质質报報单單击擊户戶级級"
+    "织織组組员員资資费費税稅传傳递遞运運输輸转轉换換选選项項边邊权權证證议議论論则則规規围圍"
+    "区區县縣场場馆館园園楼樓层層节節点點线線条條纸紙张張号號码碼钱錢银銀万萬与與专專两兩严嚴"
+    "乐樂习習买買卖賣亲親仅僅从從众眾优優伤傷儿兒农農决決况況创創别別剧劇办辦华華协協历歷压壓"
+    "厂廠参參双雙变變听聽启啟响響团團图圖处處复復够夠头頭夺奪奋奮妇婦孙孫宁寧宝寶审審宽寬导導"
+    "将將尔爾尽盡岁歲币幣师師带帶帮幫广廣庆慶库庫废廢异異弹彈归歸当當录錄态態总總恶惡护護择擇"
+    "拥擁损損敌敵无無旧舊显顯机機杀殺极極构構枪槍树樹桥橋检檢欢歡汉漢沟溝济濟热熱爱愛独獨环環"
+    "盘盤确確种種称稱积積笔筆类類练練细細继繼续續维維罗羅职職联聯肤膚药藥获獲虽雖观觀觉覺订訂"
+    "训訓记記许許评評试試诉訴详詳误誤调調谈談谢謝贝貝负負责責败敗货貨购購贸貿赛賽赶趕跃躍轻輕"
+    "较較辑輯达達迁遷进進远遠连連适適遗遺邮郵释釋钟鐘铁鐵销銷锁鎖错錯键鍵镇鎮闭閉闻聞阅閱队隊"
+    "阳陽阴陰阶階陆陸随隨险險难難雾霧顺順须須领領频頻风風飞飛饭飯马馬验驗鱼魚鸟鳥齐齊龙龍"
+)
+SIMPLIFIED_CHARS = frozenset(VARIANT_PAIRS[0::2])
+TRADITIONAL_CHARS = frozenset(VARIANT_PAIRS[1::2])
+# 日文新字体：与简体、繁体的写法都不同，出现时说明是只含汉字的日文
+JAPANESE_KANJI = frozenset("渋沢駅広円図売読気楽変労験経済歳仏発県単転伝実対関様働権戦観鉄銭総")
+
+# 判断文本为某种文字所需的字母占比
+SCRIPT_SHARE = 0.8
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+def _is_code(text):
+    """编号或标识符：含下划线，或含数字且字母部分都是短缩写或大写（如 AB-1234、M8x1.25、v2.3.1）
+
+    "Figure-1" 这类包含普通单词的记号仍需翻译。
+    """
+    if not CODE_RE.match(text):
+        return False
+    if '_' in text:
+        return True
+    if not any(ch.isdigit() for ch in text):
+        return False
+    return all(len(run) <= 3 or run.isupper() for run in LETTER_RUN_RE.findall(text))
+
+def _script(ch):
+    """字母所属的文字"""
+    code = ord(ch)
+    if 0x3040 <= code <= 0x30FF or 0x31F0 <= code <= 0x31FF:
+        return "kana"
+    if 0xAC00 <= code <= 0xD7AF or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F:
+        return "hangul"
+    if 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or 0xF900 <= code <= 0xFAFF:
+        return "han"
+    if 0x0400 <= code <= 0x04FF:
+        return "cyrillic"
+    if ch.isascii() or 0x00C0 <= code <= 0x024F:
+        return "latin"
+    return "other"
+
+def chinese_variant(text):
+    """按简繁体特有的字判断汉字文本是 "Chinese"（简体）还是 "Traditional Chinese"（繁体）
+
+    同时含有两种特有字、含有日文新字体，或没有任何特有字时无法确定，返回 None。
+    """
+    if any(ch in JAPANESE_KANJI for ch in text):
+        return None
+    simplified = any(ch in SIMPLIFIED_CHARS for ch in text)
+    traditional = any(ch in TRADITIONAL_CHARS for ch in text)
+    if simplified == traditional:
+        return None
+    return "Chinese" if simplified else "Traditional Chinese"
+
+def script_counts(text):
+    """统计各文字的字母数"""
+    counts = {}
+    for ch in text:
+        if unicodedata.category(ch).startswith('L'):
+            script = _script(ch)
+            counts[script] = counts.get(script, 0) + 1
+    return counts
+
+def is_untranslatable(text):
+    """不含可翻译的文字：纯数字、日期、符号、网址、邮箱、路径或编号"""
+    text = text.strip()
+    if not any(unicodedata.category(ch).startswith('L') for ch in text):
+        return True
+    if URL_RE.match(text) or EMAIL_RE.match(text) or PATH_RE.match(text):
+        return True
+    return _is_code(text)
+
+def is_in_language(text, target_language):
+    """文本是否已经是目标语言（只在有把握时返回 True）"""
+    counts = script_counts(text)
+    letters = sum(counts.values())
+    if not letters:
+        return False
+
+    script = SCRIPT_LANGUAGES.get(target_language)
+    if script == "kana":
+        # 日文混用汉字和假名，只要包含假名且基本没有其他文字即可
+        return counts.get("kana", 0) > 0 and (counts.get("kana", 0) + counts.get("han", 0)) / letters >= SCRIPT_SHARE
+    if script == "han":
+        # 含假名的是日文，需要翻译；简体和繁体都用汉字，还要按特有字区分，无法区分时翻译
+        if counts.get("kana") or counts.get("han", 0) / letters < SCRIPT_SHARE:
+            return False
+        return chinese_variant(text) == target_language
+    if script:
+        return counts.get(script, 0) / letters >= SCRIPT_SHARE
+
+    stopwords = STOPWORDS.get(target_language)
+    if not stopwords or counts.get("latin", 0) / letters < SCRIPT_SHARE:
+        return False
+    # 拉丁字母语言：目标语言的虚词明显多于其他语言时才认为已是目标语言
+    words = [word.lower() for word in WORD_RE.findall(text)]
+    if len(words) < 4:
+        return False
+    hits = {language: sum(1 for word in words if word in vocabulary)
+            for language, vocabulary in STOPWORDS.items()}
+    best = hits.pop(target_language)
+    return best >= 2 and best >= 0.15 * len(words) and best > 2 * max(hits.values(), default=0)
+
+def needs_translation(text, target_language):
+    """片段是否需要发送给 API 翻译"""
+    return not is_untranslatable(text) and not is_in_language(text, target_language)
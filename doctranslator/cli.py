@@ -0,0 +1,176 @@
+import argparse
+import glob
+import os
+import sys
+
+from .translator import SUPPORTED_LANGUAGES
+
+def resolve_language(name):
+    """把界面显示名称或英文名称（不区分大小写）转换为提示词中使用的语言名称"""
+    if name in SUPPORTED_LANGUAGES:
+        return SUPPORTED_LANGUAGES[name]
+    for language in SUPPORTED_LANGUAGES.values():
+        if language.lower() == name.lower():
+            return language
+    return None
+
+def expand_inputs(inputs):
+    """展开输入的文件、目录和通配符，返回去重后的 .docx 文件列表"""
+    file_paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(glob.glob(os.path.join(item, "*.docx")))
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item, recursive=True))
+        else:
+            matches = [item]
+        for path in matches:
+            name = os.path.basename(path)
+            # 跳过 Word 临时文件和已经翻译过的输出文件
+            if name.startswith("~$") or (path not in inputs and "_translated_" in name):
+                continue
+            if path not in file_paths:
+                file_paths.append(path)
+    return file_paths
+
+def build_parser():
+    languages = ", ".join(SUPPORTED_LANGUAGES.values())
+    parser = argparse.ArgumentParser(
+        prog="translate-docx",
+        description="翻译 Word 文档（无需图形界面）"
+    )
+    parser.add_argument("inputs", nargs="+", metavar="input",
+                        help="要翻译的 .docx 文件、目录或通配符（多个文件时进入批量模式）")
+    parser.add_argument("--lang", "-l", required=True,
+                        help=f"目标语言，多个语言用逗号分隔（文档只解析一次）：{languages}")
+    parser.add_argument("--output", "-o",
+                        help="输出文件路径，批量或多语言模式下为输出目录（默认在原文件旁生成 *_translated_<语言>.docx）")
+    parser.add_argument("--workers", type=int, help="同时发送的请求数（默认每个 API key 2 个）")
+    parser.add_argument("--concurrency", choices=["fixed", "adaptive"],
+                        help="并发模式：fixed 固定并发；adaptive 按延迟和错误自动调整每个 key 的并发数"
+                             "（默认读取 CONCURRENCY_MODE）")
+    parser.add_argument("--processes", type=int,
+                        help="批量翻译时解析和保存文档的子进程数（默认读取 DOC_PROCESSES，0 表示不使用）")
+    parser.add_argument("--streaming", action="store_true", default=None,
+                        help="流式读写文档 XML，适合超大文档（默认大于 STREAMING_THRESHOLD_MB 的文档自动使用）")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="逐段写入新建的文档，而不是在原文档上直接替换文本")
+    parser.add_argument("--no-preserve-format", action="store_true",
+                        help="不保留原文档格式（使用重建模式且不复制样式）")
+    parser.add_argument("--previous", metavar="PATH",
+                        help="增量翻译：上一版原文（批量翻译时为存放上一版文档的目录），"
+                             "原文未变的段落沿用上一版译文，只翻译新增和修改的段落")
+    parser.add_argument("--previous-translation", metavar="PATH",
+                        help="上一版译文（默认为输出位置或上一版原文旁最新的 {文件名}_translated_{语言}[_N].docx），"
+                             "仅用于单个文件")
+    parser.add_argument("--resume", action="store_true", help="发现未完成的翻译时自动继续")
+    parser.add_argument("--glossary", metavar="PATH",
+                        help="术语表：CSV/TSV 文件（原文,译文），或按目标语言命名文件的目录（默认读取 GLOSSARY_PATH）")
+    parser.add_argument("--backend", choices=["openai", "fake"],
+                        help="翻译后端（默认读取 TRANSLATION_BACKEND）；fake 为离线压测用的模拟后端")
+    parser.add_argument("--quiet", "-q", action="store_true", help="不显示进度")
+    parser.add_argument("--profile", action="store_true",
+                        help="完成后输出各阶段耗时（解析、翻译、写入、保存）和 API 统计")
+    parser.add_argument("--metrics-log", metavar="PATH",
+                        help="把每次 API 调用和各阶段耗时以 JSON Lines 追加到文件（默认读取 METRICS_LOG）")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="完成后以 Prometheus 文本格式写出指标（默认读取 METRICS_PROMETHEUS_FILE）")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    from .metrics import metrics
+    if args.metrics_log:
+        metrics.configure(args.metrics_log)
+    try:
+        return run(parser, args)
+    finally:
+        metrics.log("summary", **metrics.snapshot())
+        metrics.close()
+        metrics.write_prometheus(args.metrics_prom)
+        if args.profile:
+            print(metrics.stage_report(), file=sys.stderr)
+
+def run(parser, args):
+    """执行翻译，返回进程退出码"""
+    target_languages = []
+    for name in args.lang.split(","):
+        language = resolve_language(name.strip())
+        if language is None:
+            parser.error(f"不支持的目标语言: {name.strip()}")
+        if language not in target_languages:
+            target_languages.append(language)
+
+    # 延迟导入，使 --help 和参数错误无需加载 python-docx 和 openai
+    from .engine import TranslationEngine
+    from .pipeline import TranslationPipeline
+    from .backends import create_backends
+    from .glossary import load_glossaries
+    from .translator import DocTranslator
+
+    def show_progress(current, total):
+        print(f"\r进度: {current}/{total}", end="", file=sys.stderr, flush=True)
+
+    file_paths = expand_inputs(args.inputs)
+    if not file_paths:
+        parser.error("没有找到要翻译的 .docx 文件")
+    batch = (len(file_paths) > 1 or len(args.inputs) > 1 or os.path.isdir(args.inputs[0])
+             or len(target_languages) > 1)
+
+    def resume(count):
+        if not args.resume and not args.quiet:
+            print(f"发现未完成的翻译（已完成 {count} 个片段），未指定 --resume，将重新翻译全部内容", file=sys.stderr)
+        return args.resume
+
+    try:
+        translator = DocTranslator(
+            backends=create_backends(args.backend, args.workers, args.concurrency),
+            glossaries=load_glossaries(args.glossary) if args.glossary else None
+        )
+        pipeline = TranslationPipeline(
+            translator,
+            engine=TranslationEngine(translator, max_workers=args.workers, mode=args.concurrency),
+            preserve_format=not args.no_preserve_format,
+            in_place=not (args.rebuild or args.no_preserve_format),
+            progress_callback=None if args.quiet else show_progress,
+            resume_callback=resume,
+            processes=args.processes,
+            streaming=args.streaming
+        )
+        if batch:
+            def show_file(file_path, output_path, error):
+                if not args.quiet:
+                    print(file=sys.stderr)
+                if error:
+                    print(f"{file_path}: 翻译失败：{str(error)}", file=sys.stderr)
+                else:
+                    print(output_path)
+
+            languages = target_languages if len(target_languages) > 1 else target_languages[0]
+            results = pipeline.translate_batch(file_paths, languages, args.output, show_file,
+                                               previous_source=args.previous)
+            pipeline.engine.close()
+            failed = [path for path, result in results.items() if isinstance(result, Exception)]
+            if not args.quiet:
+                print(f"\n完成 {len(results) - len(failed)}/{len(results)} 个文件", file=sys.stderr)
+            return 1 if failed else 0
+
+        output_path = pipeline.translate_file(file_paths[0], target_languages[0], args.output,
+                                              previous_source=args.previous,
+                                              previous_translation=args.previous_translation)
+        pipeline.engine.close()
+    except Exception as e:
+        if not args.quiet:
+            print(file=sys.stderr)
+        print(f"翻译过程中出错：{str(e)}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(output_path)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
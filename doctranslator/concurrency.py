@@ -0,0 +1,110 @@
+import os
+import time
+import threading
+
+from .metrics import metrics
+
+def concurrency_mode(mode=None):
+    """并发模式：fixed 或 adaptive，未指定时读取 CONCURRENCY_MODE"""
+    mode = (mode or os.getenv('CONCURRENCY_MODE', 'fixed')).lower()
+    if mode not in ('fixed', 'adaptive'):
+        raise ValueError(f"未知的并发模式: {mode}")
+    return mode
+
+def default_workers(key_count, mode=None, max_per_key=None):
+    """同时进行的请求数上限：fixed 模式每个 key MAX_WORKERS_PER_KEY 个，
+    adaptive 模式每个 key 按并发上限 ADAPTIVE_MAX_PER_KEY 个
+
+    引擎的线程数和共用 HTTP 连接池的大小都按此设置，连接数不会限制实际并发。
+    """
+    if concurrency_mode(mode) == 'adaptive':
+        if max_per_key is None:
+            max_per_key = int(os.getenv('ADAPTIVE_MAX_PER_KEY', '8'))
+    else:
+        max_per_key = int(os.getenv('MAX_WORKERS_PER_KEY', '2'))
+    return max(1, key_count * max_per_key)
+
+class KeyConcurrency:
+    """单个 API key 的并发窗口"""
+    def __init__(self, limit):
+        self.limit = float(limit)  # 允许同时进行的请求数（取整后使用）
+        self.in_flight = 0
+        self.baseline = None       # 正常情况下的请求耗时（缓慢上升的最小值）
+        self.last_decrease = 0.0   # 上次减小窗口的时间（time.monotonic）
+
+class AIMDController:
+    """按观测到的延迟和错误自适应调整每个 key 的并发数（加性增、乘性减）
+
+    请求成功且耗时未明显变长时，窗口每轮增加约 1 个请求；
+    遇到 429、5xx 或超时时窗口减半。窗口限制在 [min_limit, max_limit] 之间，
+    最终稳定在每个 key 可持续的最高并发附近。
+    """
+    def __init__(self, key_count, min_limit=None, max_limit=None, initial=None,
+                 decrease=0.5, latency_tolerance=2.0):
+        if min_limit is None:
+            min_limit = int(os.getenv('ADAPTIVE_MIN_PER_KEY', '1'))
+        if max_limit is None:
+            max_limit = int(os.getenv('ADAPTIVE_MAX_PER_KEY', '8'))
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        if initial is None:
+            initial = self.min_limit
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.keys = [KeyConcurrency(min(max(initial, self.min_limit), self.max_limit)) for _ in range(key_count)]
+        self._lock = threading.Lock()
+
+    def try_acquire(self, index):
+        """该 key 的窗口未满时占用一个位置并返回 True"""
+        with self._lock:
+            state = self.keys[index]
+            if state.in_flight < int(state.limit):
+                state.in_flight += 1
+                return True
+            return False
+
+    def has_capacity(self, index):
+        with self._lock:
+            state = self.keys[index]
+            return state.in_flight < int(state.limit)
+
+    def release(self, index):
+        """请求结束（无论成功与否）时释放位置"""
+        with self._lock:
+            state = self.keys[index]
+            state.in_flight = max(0, state.in_flight - 1)
+
+    def on_success(self, index, latency):
+        """请求成功：耗时正常时加性增大窗口"""
+        with self._lock:
+            state = self.keys[index]
+            if state.baseline is None or latency < state.baseline:
+                state.baseline = latency
+            else:
+                # 缓慢跟随，避免一次偶然的快速请求把基准压得过低
+                state.baseline = state.baseline * 0.95 + latency * 0.05
+            if latency > state.baseline * self.latency_tolerance:
+                # 耗时明显变长，说明服务端已在排队，保持当前窗口
+                return
+            old = int(state.limit)
+            state.limit = min(self.max_limit, state.limit + 1.0 / state.limit)
+            new = int(state.limit)
+        if new != old:
+            metrics.log("concurrency_limit", key=index + 1, limit=new)
+
+    def on_overload(self, index):
+        """429、5xx 或超时：乘性减小窗口
+
+        同一时刻多个进行中的请求可能同时失败，一个基准耗时内只减小一次。
+        """
+        with self._lock:
+            state = self.keys[index]
+            now = time.monotonic()
+            if now - state.last_decrease < (state.baseline or 1.0):
+                return
+            state.last_decrease = now
+            old = int(state.limit)
+            state.limit = max(self.min_limit, state.limit * self.decrease)
+            new = int(state.limit)
+        if new != old:
+            metrics.log("concurrency_limit", key=index + 1, limit=new)
@@ -0,0 +1,192 @@
+"""直接读写 Word XML 中的段落文本，用于原地翻译"""
+import re
+from copy import deepcopy
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.opc.part import PartFactory, XmlPart
+from docx.oxml.ns import qn
+
+W_P = qn('w:p')
+W_R = qn('w:r')
+W_RPR = qn('w:rPr')
+W_T = qn('w:t')
+W_TAB = qn('w:tab')
+W_BR = qn('w:br')
+W_CR = qn('w:cr')
+W_TYPE = qn('w:type')
+W_FLD_CHAR = qn('w:fldChar')
+W_FLD_CHAR_TYPE = qn('w:fldCharType')
+W_FLD_SIMPLE = qn('w:fldSimple')
+W_TXBX_CONTENT = qn('w:txbxContent')
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+# 域（页码、总页数、日期等）在段落文本中的占位标记 ⟦1⟧、⟦2⟧……
+# 域结果由 Word 更新，既不读取也不改写，译文只写在各个域之间
+FIELD_MARKER = "⟦{}⟧"
+FIELD_MARKER_RE = re.compile(r'⟦(\d+)⟧')
+
+# 包含可翻译文本的部件：正文、各种页眉页脚（默认、首页、偶数页）、脚注、尾注和批注
+TEXT_PART_RE = re.compile(r'^/word/(document|header\d*|footer\d*|footnotes|endnotes|comments)\.xml$')
+
+# python-docx 把脚注、尾注（旧版本还包括批注）加载为只有二进制内容的通用部件，
+# 注册为 XmlPart 后可以像页眉页脚一样直接读写其中的段落，保存时自动重新序列化
+for _content_type in (CT.WML_FOOTNOTES, CT.WML_ENDNOTES, CT.WML_COMMENTS):
+    PartFactory.part_type_for.setdefault(_content_type, XmlPart)
+
+def iter_text_parts(doc):
+    """按固定顺序返回文档中包含可翻译文本的部件 (部件名, 部件)"""
+    parts = []
+    for part in doc.part.package.iter_parts():
+        if TEXT_PART_RE.match(str(part.partname)) and hasattr(part, 'element'):
+            parts.append(part)
+    # 正文在前，其余按部件名排序，保证每次遍历顺序一致
+    parts.sort(key=lambda part: (part is not doc.part, str(part.partname)))
+    return [(str(part.partname), part) for part in parts]
+
+def iter_paragraphs(element):
+    """按文档顺序返回元素下的所有段落，包括表格和文本框中的段落"""
+    return element.iter(W_P)
+
+def _node_text(node):
+    """文本节点对应的文本，与 python-docx 的 Run.text 一致：w:tab 为制表符，换行符 w:br 和 w:cr 为 \n
+
+    分页符、分栏符（w:br 的 type 不是 textWrapping）不是文本，返回空字符串。
+    """
+    if node.tag == W_T:
+        return node.text or ""
+    if node.tag == W_TAB:
+        return "\t"
+    if node.tag == W_CR or node.get(W_TYPE, 'textWrapping') == 'textWrapping':
+        return "\n"
+    return ""
+
+def _split_fields(paragraph):
+    """按域切分段落本身的内容（不进入文本框等嵌套段落），返回 (各段的文本节点, 域)
+
+    文本节点为 w:t，以及 run 中表示制表符和换行的 w:tab、w:br、w:cr；
+    段落属性中定义制表位的 w:tab 和分页符不是文本节点。
+    每个域为 [开始元素, 结束元素]：w:fldSimple 两者都是它本身，复合域为 begin 和 end 所在的 run，
+    在下一段落才结束的域（如目录）结束元素为 None。第 k 个域位于第 k 段和第 k+1 段文本之间，
+    域代码和域结果中的文本都不属于任何一段。
+    """
+    slots = [[]]
+    fields = []
+    depth = 0  # 所在复合域的嵌套层数
+    stack = list(reversed(list(paragraph)))
+    while stack:
+        element = stack.pop()
+        if element.tag == W_P:
+            continue
+        if element.tag == W_FLD_SIMPLE:
+            if depth == 0:
+                fields.append([element, element])
+                slots.append([])
+            continue
+        if element.tag == W_FLD_CHAR:
+            kind = element.get(W_FLD_CHAR_TYPE)
+            if kind == 'begin':
+                if depth == 0:
+                    fields.append([element.getparent(), None])
+                    slots.append([])
+                depth += 1
+            elif kind == 'end' and depth:
+                depth -= 1
+                if depth == 0:
+                    fields[-1][1] = element.getparent()
+        elif depth == 0 and element.tag in (W_T, W_TAB, W_BR, W_CR):
+            if element.tag == W_T or (element.getparent().tag == W_R and _node_text(element)):
+                slots[-1].append(element)
+        stack.extend(reversed(list(element)))
+    return slots, fields
+
+def _join(slots):
+    pieces = []
+    for k, nodes in enumerate(slots):
+        if k:
+            pieces.append(FIELD_MARKER.format(k))
+        pieces.extend(_node_text(node) for node in nodes)
+    return "".join(pieces)
+
+def paragraph_text(paragraph):
+    """段落本身的文本（不含嵌套在文本框中的段落），域以 ⟦1⟧、⟦2⟧…… 标记代替"""
+    return _join(_split_fields(paragraph)[0])
+
+def strip_fields(text):
+    """去掉文本中的域标记，用于不保留域的重建模式"""
+    return FIELD_MARKER_RE.sub("", text)
+
+def _text_pieces(text, field_count):
+    """把译文按域标记切成 field_count + 1 段；标记丢失或顺序改变时整段译文写在第一个域之前"""
+    if not field_count:
+        return [text]
+    parts = FIELD_MARKER_RE.split(text)
+    if [int(number) for number in parts[1::2]] == list(range(1, field_count + 1)):
+        return parts[0::2]
+    return [strip_fields(text)] + [""] * field_count
+
+def _new_nodes(reference, text):
+    """把文本转换为 w:t、w:tab 和 w:br 节点"""
+    nodes = []
+    for piece in re.split(r'(\t|\n)', text):
+        if piece == "\t":
+            nodes.append(reference.makeelement(W_TAB, {}))
+        elif piece == "\n":
+            nodes.append(reference.makeelement(W_BR, {}))
+        elif piece:
+            node = reference.makeelement(W_T, {})
+            node.text = piece
+            node.set(XML_SPACE, 'preserve')
+            nodes.append(node)
+    return nodes
+
+def _new_run(reference, slots, k):
+    """在第 k 段的位置新建一个 run，沿用最近一段文本所在 run 的字符格式，
+    段落中没有其他文本时沿用域所在 run（或 w:fldSimple 中第一个 run）的格式
+    """
+    run = reference.makeelement(W_R, {})
+    nearest = sorted((abs(i - k), i) for i, nodes in enumerate(slots) if nodes)
+    if nearest:
+        source = slots[nearest[0][1]][0].getparent()
+    else:
+        source = reference if reference.tag == W_R else reference.find(W_R)
+    properties = source.find(W_RPR) if source is not None and source.tag == W_R else None
+    if properties is not None:
+        run.append(deepcopy(properties))
+    return run
+
+def set_paragraph_text(paragraph, text):
+    """把段落文本替换为 text，保留段落、run 的格式和段落中的域
+
+    text 中的 ⟦k⟧ 标记对应段落中的第 k 个域，各段译文分别写在对应的两个域之间：
+    写入该位置第一个文本节点所在的 run，没有文本节点时在域旁新建 run；
+    其中的制表符和换行符还原为 w:tab 和 w:br，原有的文本节点全部删除，分页符等非文本元素保留。
+    片段文本去掉了首尾空白，原段落首尾的制表符、换行等在写入时保留。
+    """
+    slots, fields = _split_fields(paragraph)
+    if not fields and not slots[0]:
+        return False
+    original = _join(slots)
+    if original.strip():
+        text = original[:len(original) - len(original.lstrip())] + text.strip() + original[len(original.rstrip()):]
+    pieces = _text_pieces(text, len(fields))
+    if fields and fields[-1][1] is None:
+        # 最后一个域在下一段落才结束，其后没有位置可写
+        last = pieces.pop()
+        pieces[-1] += last
+        slots.pop()
+
+    for k, (nodes, piece) in enumerate(zip(slots, pieces)):
+        if nodes:
+            anchor = nodes[0]
+            for node in _new_nodes(anchor, piece):
+                anchor.addprevious(node)
+            for node in nodes:
+                node.getparent().remove(node)
+        elif piece:
+            reference = fields[0][0] if k == 0 else fields[k - 1][1]
+            run = _new_run(reference, slots, k)
+            run.extend(_new_nodes(run, piece))
+            if k == 0:
+                reference.addprevious(run)
+            else:
+                reference.addnext(run)
+    return True
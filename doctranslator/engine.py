@@ -0,0 +1,118 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .concurrency import AIMDController, concurrency_mode, default_workers
+
+class TranslationCancelled(Exception):
+    """翻译被用户取消"""
+
+class TranslationEngine:
+    """并发翻译引擎：把请求分散到所有 API key 上同时发送，并按原顺序返回结果
+
+    同一个引擎可以被多个文档共享（见 TranslationPipeline.translate_batch），
+    所有请求进入同一个线程池排队，使每个 key 都保持忙碌。
+
+    mode 为 fixed（默认，每个 key 固定 MAX_WORKERS_PER_KEY 个并发）或 adaptive
+    （按延迟和错误自动调整每个 key 的并发数，范围为 [min_per_key, max_per_key]，
+    见 AIMDController）；未指定时读取 CONCURRENCY_MODE。
+    """
+    def __init__(self, translator, max_workers=None, mode=None, min_per_key=None, max_per_key=None):
+        self.translator = translator
+        self.mode = concurrency_mode(mode)
+        self.concurrency = None
+        if self.mode == 'adaptive':
+            limiter = translator.rate_limiter
+            # 同一个 translator 的多个引擎共用控制器，保留已学到的并发窗口
+            if limiter.concurrency is None:
+                limiter.concurrency = AIMDController(len(translator.backends), min_per_key, max_per_key)
+            self.concurrency = limiter.concurrency
+        if max_workers is None:
+            # 自适应模式下线程数按并发上限准备，实际并发由控制器决定
+            max_workers = default_workers(
+                len(translator.backends), self.mode,
+                self.concurrency.max_limit if self.concurrency else None
+            )
+        self.max_workers = max(1, max_workers)
+        self._running = threading.Event()  # 未设置时表示暂停
+        self._running.set()
+        self._cancelled = threading.Event()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._client_counter = itertools.count()
+
+    def pause(self):
+        """暂停派发新的请求（已发出的请求会继续完成）"""
+        self._running.clear()
+
+    def resume(self):
+        """继续派发请求"""
+        self._running.set()
+
+    def cancel(self):
+        """取消翻译：不再派发新的请求，等待结果的 iter_completed 抛出 TranslationCancelled
+
+        可以从其他线程（如界面线程）调用。已发出的请求会完成，但结果被丢弃。
+        """
+        self._cancelled.set()
+        # 解除暂停，使等待中的线程尽快退出
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _wait_running(self):
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise TranslationCancelled("翻译已取消")
+
+    def _translate_batch(self, texts, target_language, client_index, on_segment):
+        self._wait_running()
+        return self.translator.translate_batch(texts, target_language, client_index, on_segment)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def submit_batch(self, texts, target_language, client_index=None, on_segment=None):
+        """提交一个批量翻译请求（多个文本合并为一次 API 调用），Future 的结果为译文列表
+
+        on_segment(index, translated_text) 在工作线程中于每个片段完成时调用。
+        """
+        if client_index is None:
+            client_index = next(self._client_counter) % len(self.translator.backends)
+        return self._get_executor().submit(self._translate_batch, texts, target_language, client_index, on_segment)
+
+    def iter_completed(self, futures, on_idle=None):
+        """按完成顺序逐个返回 futures 中的 Future，等待期间定期调用 on_idle()
+
+        调用方中途退出（包括出错）时，会取消尚未开始的请求；
+        调用 cancel() 后抛出 TranslationCancelled。
+        """
+        pending = set(futures)
+        try:
+            while pending:
+                if self._cancelled.is_set():
+                    raise TranslationCancelled("翻译已取消")
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future
+                if on_idle:
+                    on_idle()
+        finally:
+            if pending:
+                # 取消尚未开始的请求，并解除暂停以便已排队的线程退出
+                for future in pending:
+                    future.cancel()
+                self.resume()
+
+    def close(self):
+        """关闭线程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            self.resume()
+            executor.shutdown(wait=True)
@@ -0,0 +1,148 @@
+"""术语表：为每个目标语言加载术语，用 Aho–Corasick 自动机一次扫描找出文本中出现的术语
+
+只把实际出现在本次请求中的术语加入提示词，术语表再大也不会增加无关的 token。
+"""
+import os
+import csv
+import json
+import hashlib
+from collections import deque
+
+GLOSSARY_EXTENSIONS = ('.csv', '.tsv', '.txt')
+
+def _is_word_char(ch):
+    return ch.isascii() and (ch.isalnum() or ch == '_')
+
+class TermMatcher:
+    """Aho–Corasick 多模式匹配：构建一次，之后每次匹配的耗时只与文本长度有关
+
+    匹配不区分大小写；以字母或数字开头/结尾的拉丁文术语要求完整的单词边界，
+    避免 "cat" 匹配到 "category"。中日韩术语没有单词边界，按子串匹配。
+    """
+    def __init__(self, patterns):
+        self._goto = [{}]    # 状态 -> {字符: 下一状态}
+        self._fail = [0]
+        self._output = [[]]  # 状态 -> 在此结束的模式下标
+        self.patterns = []
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern):
+        key = pattern.lower()
+        if not key:
+            return
+        state = 0
+        for ch in key:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(len(self.patterns))
+        self.patterns.append(key)
+
+    def _build(self):
+        """按广度优先计算失败指针，并合并输出"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """返回文本中出现的模式下标（按首次出现的顺序，不重复）"""
+        found = {}
+        lowered = text.lower()
+        state = 0
+        for end, ch in enumerate(lowered):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for index in self._output[state]:
+                if index in found:
+                    continue
+                start = end - len(self.patterns[index]) + 1
+                if self._at_boundary(lowered, start, end, self.patterns[index]):
+                    found[index] = True
+        return list(found)
+
+    @staticmethod
+    def _at_boundary(text, start, end, pattern):
+        if _is_word_char(pattern[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if _is_word_char(pattern[-1]) and end + 1 < len(text) and _is_word_char(text[end + 1]):
+            return False
+        return True
+
+class Glossary:
+    """一个目标语言的术语表 {原文术语: 译文}"""
+    def __init__(self, terms):
+        self.terms = {}
+        for source, target in terms:
+            source, target = source.strip(), target.strip()
+            if source and target:
+                self.terms[source] = target
+        self._sources = list(self.terms)
+        self._matcher = TermMatcher(self._sources)
+
+    def __len__(self):
+        return len(self.terms)
+
+    @classmethod
+    def load(cls, path):
+        """读取 CSV/TSV 术语表：每行 原文,译文；以 # 开头的行和表头 source,target 被忽略"""
+        delimiter = '\t' if path.lower().endswith(('.tsv', '.txt')) else ','
+        terms = []
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.reader(f, delimiter=delimiter):
+                if len(row) < 2 or row[0].lstrip().startswith('#'):
+                    continue
+                if row[0].strip().lower() == 'source' and row[1].strip().lower() == 'target':
+                    continue
+                terms.append((row[0], row[1]))
+        return cls(terms)
+
+    def match(self, text):
+        """返回文本中出现的 [(原文术语, 译文)]"""
+        return [(self._sources[i], self.terms[self._sources[i]]) for i in self._matcher.find(text)]
+
+def format_terms(terms):
+    """把术语写成提示词中的说明"""
+    pairs = ", ".join(
+        f"{json.dumps(source, ensure_ascii=False)} -> {json.dumps(target, ensure_ascii=False)}"
+        for source, target in terms
+    )
+    return f"Always translate these terms as given (source -> target): {pairs}."
+
+def terms_digest(terms):
+    """术语的哈希，作为翻译记忆键的一部分：术语表修改后，受影响的片段不再使用旧译文"""
+    return hashlib.sha256(json.dumps(sorted(terms), ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+def load_glossaries(path):
+    """读取术语表，返回 {目标语言: Glossary}
+
+    path 为目录时，每个文件对应一个目标语言，文件名为语言名称（如 Japanese.csv 或 日本語.csv）；
+    path 为文件时，该术语表用于所有目标语言（键为 None）。
+    """
+    from .translator import SUPPORTED_LANGUAGES
+
+    glossaries = {}
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in GLOSSARY_EXTENSIONS:
+                continue
+            language = SUPPORTED_LANGUAGES.get(stem, stem)
+            glossaries[language] = Glossary.load(os.path.join(path, name))
+    else:
+        glossaries[None] = Glossary.load(path)
+    return glossaries
@@ -0,0 +1,453 @@
+import os
+import time
+import queue
+import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+from tkinter.ttk import Progressbar
+from docx import Document
+
+from .engine import TranslationCancelled
+from .translator import DocTranslator
+from .pipeline import TranslationPipeline, get_cache_dir, clean_cache, get_unique_filename
+
+class TranslatorGUI:
+    def __init__(self):
+        try:
+            self.translator = DocTranslator()
+        except ValueError as e:
+            messagebox.showerror("错误", str(e))
+            raise
+            
+        self.window = tk.Tk()
+        self.window.title("多语言文档翻译器")
+        self.window.geometry("600x400")
+        
+        self.is_paused = False
+        self.translation_start_time = None
+        self.processed_paragraphs = 0
+        self.engine = None  # 当前运行中的并发翻译引擎
+        self.worker = None  # 后台翻译线程
+        # 后台线程发给界面线程的事件：(类型, 数据...)
+        self.events = queue.Queue()
+        
+        # 创建界面元素
+        self.setup_gui()
+        self.window.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def setup_gui(self):
+        # 创建主框架
+        main_frame = ttk.Frame(self.window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 选择文件按钮
+        self.select_button = ttk.Button(
+            main_frame,
+            text="选择Word文档",
+            command=self.select_file,
+            width=20
+        )
+        self.select_button.pack(pady=10)
+        
+        # 文件路径显示
+        self.file_label = ttk.Label(main_frame, text="未选择文件", wraplength=500)
+        self.file_label.pack(pady=5)
+        
+        # 语言选择框架
+        lang_frame = ttk.LabelFrame(main_frame, text="翻译设置", padding="5")
+        lang_frame.pack(fill=tk.X, pady=10, padx=5)
+        
+        # 目标语言选择
+        ttk.Label(lang_frame, text="目标语言：").pack(side=tk.LEFT, padx=5)
+        self.target_language = tk.StringVar(value="简体中文")
+        self.language_combo = ttk.Combobox(
+            lang_frame,
+            textvariable=self.target_language,
+            values=list(self.translator.supported_languages.keys()),
+            state="readonly",
+            width=20
+        )
+        self.language_combo.pack(side=tk.LEFT, padx=5)
+        
+        # 格式选项
+        self.preserve_format = tk.BooleanVar(value=True)
+        self.format_check = ttk.Checkbutton(
+            lang_frame,
+            text="保留原文档格式",
+            variable=self.preserve_format
+        )
+        self.format_check.pack(side=tk.LEFT, padx=20)
+        
+        # 进度条
+        self.progress = Progressbar(
+            main_frame,
+            orient=tk.HORIZONTAL,
+            length=500,
+            mode='determinate'
+        )
+        self.progress.pack(pady=10)
+        
+        # 状态标签
+        self.status_label = ttk.Label(main_frame, text="")
+        self.status_label.pack(pady=5)
+        
+        # 添加控制框架
+        control_frame = ttk.LabelFrame(main_frame, text="翻译控制", padding="5")
+        control_frame.pack(fill=tk.X, pady=10, padx=5)
+        
+        # 开始翻译按钮
+        self.translate_button = ttk.Button(
+            control_frame,
+            text="开始翻译",
+            command=self.start_translation,
+            width=15,
+            state=tk.DISABLED
+        )
+        self.translate_button.pack(side=tk.LEFT, padx=5)
+        
+        # 暂停/继续按钮
+        self.pause_button = ttk.Button(
+            control_frame,
+            text="暂停",
+            command=self.toggle_pause,
+            width=15,
+            state=tk.DISABLED
+        )
+        self.pause_button.pack(side=tk.LEFT, padx=5)
+        
+        # 取消按钮
+        self.cancel_button = ttk.Button(
+            control_frame,
+            text="取消",
+            command=self.cancel_translation,
+            width=15,
+            state=tk.DISABLED
+        )
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        
+        # 清理缓存按钮
+        self.clean_cache_button = ttk.Button(
+            control_frame,
+            text="清理缓存",
+            command=self.clean_cache_with_confirm,
+            width=15
+        )
+        self.clean_cache_button.pack(side=tk.LEFT, padx=5)
+        
+        # 状态信息框架
+        status_frame = ttk.LabelFrame(main_frame, text="状态信息", padding="5")
+        status_frame.pack(fill=tk.X, pady=10, padx=5)
+        
+        # 进度信息
+        self.progress_label = ttk.Label(status_frame, text="进度: 0/0")
+        self.progress_label.pack(side=tk.LEFT, padx=5)
+        
+        # 剩余时间
+        self.time_label = ttk.Label(status_frame, text="预计剩余时间: --:--")
+        self.time_label.pack(side=tk.LEFT, padx=5)
+        
+        # 缓存状态
+        self.cache_label = ttk.Label(status_frame, text="缓存状态: 无")
+        self.cache_label.pack(side=tk.LEFT, padx=5)
+        
+        # 添加说明文本
+        help_text = "支持的语言简体中文、繁體中文、日本語、English、Español、Français、Deutsch、한국어、Русский、Italiano"
+        help_label = ttk.Label(main_frame, text=help_text, wraplength=500, foreground="gray")
+        help_label.pack(pady=10)
+
+    def toggle_pause(self):
+        """切换暂停/继续状态"""
+        self.is_paused = not self.is_paused
+        if self.is_paused:
+            if self.engine:
+                self.engine.pause()
+            self.pause_button.config(text="继续")
+            self.status_label.config(text="翻译已暂停（进行中的请求会完成）")
+        else:
+            if self.engine:
+                self.engine.resume()
+            self.pause_button.config(text="暂停")
+            self.status_label.config(text="继续翻译...")
+
+    def update_progress_info(self, current, total):
+        """更新进度信息"""
+        self.progress_label.config(text=f"进度: {current}/{total}")
+        
+        if self.translation_start_time and current > 0:
+            elapsed_time = time.time() - self.translation_start_time
+            avg_time_per_para = elapsed_time / current
+            remaining_paras = total - current
+            estimated_remaining_time = avg_time_per_para * remaining_paras
+            
+            # 转换为时分秒格式
+            hours = int(estimated_remaining_time // 3600)
+            minutes = int((estimated_remaining_time % 3600) // 60)
+            seconds = int(estimated_remaining_time % 60)
+            
+            if hours > 0:
+                time_str = f"{hours}小时{minutes}分钟"
+            elif minutes > 0:
+                time_str = f"{minutes}分钟{seconds}秒"
+            else:
+                time_str = f"{seconds}秒"
+                
+            self.time_label.config(text=f"预计剩余时间: {time_str}")
+
+    def update_cache_status(self):
+        """更新缓存状态"""
+        try:
+            cache_dir = get_cache_dir(self.file_path)
+            if os.path.exists(cache_dir):
+                cache_files = len(os.listdir(cache_dir))
+                cache_size = sum(os.path.getsize(os.path.join(cache_dir, f)) 
+                               for f in os.listdir(cache_dir))
+                size_str = f"{cache_size/1024/1024:.1f}MB" if cache_size > 1024*1024 else f"{cache_size/1024:.1f}KB"
+                self.cache_label.config(text=f"缓存状态: {cache_files}个文件 ({size_str})")
+            else:
+                self.cache_label.config(text="缓存状态: 无")
+        except:
+            self.cache_label.config(text="缓存状态: 未知")
+
+    def clean_cache_with_confirm(self):
+        """清理缓存并确认"""
+        if messagebox.askyesno("确认", "确定要清理所有缓存文件吗？"):
+            self.clean_cache()
+            self.update_cache_status()
+            messagebox.showinfo("成功", "缓存已清理")
+
+    def get_unique_filename(self, base_path, target_language):
+        """获取唯一的文件名"""
+        return get_unique_filename(base_path, target_language)
+
+    def start_translation(self):
+        if not hasattr(self, 'file_path'):
+            messagebox.showerror("错误", "请先选择文件")
+            return
+        if self.worker and self.worker.is_alive():
+            return
+        
+        # 重置计时器和进度
+        self.translation_start_time = time.time()
+        self.processed_paragraphs = 0
+        
+        # 翻译期间禁用开始按钮，启用暂停和取消按钮
+        self.translate_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.status_label.config(text="正在读取文档...")
+        
+        # 获取选择的目标语言
+        target_language = self.translator.supported_languages[self.target_language.get()]
+        
+        pipeline = TranslationPipeline(
+            self.translator,
+            preserve_format=self.preserve_format.get(),
+            # 保留格式时直接在原文档上替换文本，否则生成不带格式的新文档
+            in_place=self.preserve_format.get(),
+            # 以下回调在后台线程中调用，只向队列发送事件，由界面线程处理
+            progress_callback=lambda current, total: self.events.put(("progress", current, total)),
+            resume_callback=self.ask_resume
+        )
+        self.engine = pipeline.engine
+        if self.is_paused:
+            self.engine.pause()
+        
+        # 在后台线程中翻译，界面线程只负责轮询事件队列
+        self.worker = threading.Thread(
+            target=self.translation_worker,
+            args=(pipeline, self.file_path, target_language),
+            daemon=True
+        )
+        self.worker.start()
+        self.window.after(100, self.poll_events)
+
+    def translation_worker(self, pipeline, file_path, target_language):
+        """后台线程：执行翻译并把结果放入事件队列"""
+        try:
+            output_path = pipeline.translate_file(file_path, target_language)
+            self.events.put(("done", output_path, pipeline.failures.get(file_path, 0)))
+        except TranslationCancelled:
+            self.events.put(("cancelled",))
+        except Exception as e:
+            self.events.put(("error", e))
+        finally:
+            pipeline.engine.close()
+
+    def ask_resume(self, count):
+        """在后台线程中调用：请界面线程弹出续传确认框，并等待用户选择"""
+        reply = queue.Queue()
+        self.events.put(("ask_resume", count, reply))
+        return reply.get()
+
+    def poll_events(self):
+        """处理后台线程发来的事件；翻译未结束时继续定时轮询"""
+        progress = None
+        finished = False
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            kind = event[0]
+            if kind == "progress":
+                # 只显示最新的进度
+                progress = event[1:]
+            elif kind == "ask_resume":
+                _, count, reply = event
+                reply.put(messagebox.askyesno(
+                    "发现未完成翻译",
+                    f"上次的翻译已完成 {count} 个元素，是否继续上次的翻译？\n"
+                    "选择“是”只翻译剩余和失败的部分，选择“否”将重新翻译全部内容。"
+                ))
+            else:
+                if progress:
+                    self.update_progress(*progress)
+                    progress = None
+                self.translation_finished(event)
+                finished = True
+        if progress:
+            self.update_progress(*progress)
+        if not finished:
+            self.window.after(100, self.poll_events)
+
+    def translation_finished(self, event):
+        """在界面线程中处理翻译结束：显示结果并恢复按钮状态"""
+        kind = event[0]
+        self.engine = None
+        self.worker = None
+        self.translate_button.config(state=tk.NORMAL)
+        self.pause_button.config(state=tk.DISABLED, text="暂停")
+        self.cancel_button.config(state=tk.DISABLED)
+        self.is_paused = False
+        self.progress['value'] = 0
+        self.update_cache_status()
+        if kind == "done":
+            self.status_label.config(text="翻译完成！")
+            if event[2]:
+                messagebox.showwarning(
+                    "部分翻译失败",
+                    f"翻译已完成，但有 {event[2]} 个元素翻译失败，已保留原文。\n保存至: {event[1]}\n"
+                    "再次翻译并选择继续上次的翻译时只重试这些元素。"
+                )
+            else:
+                messagebox.showinfo("成功", f"翻译已完成！\n保存至: {event[1]}")
+        elif kind == "cancelled":
+            self.status_label.config(text="翻译已取消，已完成的部分会在下次翻译时继续")
+        else:
+            self.status_label.config(text="翻译失败")
+            messagebox.showerror("错误", f"翻译过程中出错：{str(event[1])}")
+
+    def cancel_translation(self):
+        """取消正在进行的翻译"""
+        if self.engine:
+            self.engine.cancel()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.pause_button.config(state=tk.DISABLED)
+            self.status_label.config(text="正在取消，等待进行中的请求结束...")
+
+    def on_close(self):
+        """关闭窗口：先取消正在进行的翻译"""
+        if self.worker and self.worker.is_alive():
+            if not messagebox.askyesno("确认", "翻译仍在进行，确定要退出吗？已完成的部分会在下次翻译时继续。"):
+                return
+            if self.engine:
+                self.engine.cancel()
+        self.window.destroy()
+
+    def select_file(self):
+        """选择要翻译的Word文档"""
+        file_path = filedialog.askopenfilename(
+            title="选择Word文档",
+            filetypes=[("Word文档", "*.docx"), ("所有文件", "*.*")]
+        )
+        if file_path:
+            self.file_path = file_path
+            self.file_label.config(text=f"已选择: {file_path}")
+            self.translate_button.config(state=tk.NORMAL)
+
+    def diagnose_document(self, doc_path):
+        """断文档问题"""
+        try:
+            # 检查文件大小
+            file_size = os.path.getsize(doc_path)
+            print(f"文件大小: {file_size} 字节")
+
+            # 尝试以二进制方式读取
+            with open(doc_path, 'rb') as f:
+                content = f.read()
+                # 检查文件头部是否为有效的 Office Open XML 格式
+                if not content.startswith(b'PK'):
+                    return "文件不是有效的 Office Open XML 格式"
+
+            # 尝试打开文档并分析内容
+            doc = Document(doc_path)
+            
+            # 收集文档信息
+            info = {
+                "段落数": len(doc.paragraphs),
+                "样式数": len(doc.styles),
+                "节数": len(doc.sections),
+                "表格数": len(doc.tables)
+            }
+            
+            # 检查段落内容
+            problematic_paras = []
+            for i, para in enumerate(doc.paragraphs):
+                try:
+                    # 尝试访问段落属性
+                    style = para.style
+                    format = para.paragraph_format
+                    runs = para.runs
+                except Exception as e:
+                    problematic_paras.append(f"段落 {i+1}: {str(e)}")
+
+            return {
+                "基本信息": info,
+                "问题段落": problematic_paras
+            }
+
+        except Exception as e:
+            return f"诊断时发生错误: {str(e)}"
+
+    def run(self):
+        """运行应用程序"""
+        self.window.mainloop()
+
+    def clean_cache(self):
+        """清理所有缓存文件"""
+        clean_cache(self.file_path)
+
+    def update_progress(self, current, total):
+        """更新进度信息"""
+        self.progress['maximum'] = max(total, 1)
+        self.progress['value'] = current
+        self.progress_label.config(text=f"进度: {current}/{total}")
+        if not self.is_paused:
+            self.status_label.config(text=f"正在翻译第 {current}/{total} 个元素...")
+        
+        if self.translation_start_time and current > 0:
+            elapsed_time = time.time() - self.translation_start_time
+            avg_time_per_element = elapsed_time / current
+            remaining_elements = total - current
+            estimated_remaining_time = avg_time_per_element * remaining_elements
+            
+            # 转换为时分秒格式
+            hours = int(estimated_remaining_time // 3600)
+            minutes = int((estimated_remaining_time % 3600) // 60)
+            seconds = int(estimated_remaining_time % 60)
+            
+            if hours > 0:
+                time_str = f"{hours}小时{minutes}分钟"
+            elif minutes > 0:
+                time_str = f"{minutes}分钟{seconds}秒"
+            else:
+                time_str = f"{seconds}秒"
+                
+            self.time_label.config(text=f"预计剩余时间: {time_str}")
+
+def main():
+    app = TranslatorGUI()
+    app.run()
+
+if __name__ == "__main__":
+    main()
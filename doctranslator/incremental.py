@@ -0,0 +1,100 @@
+"""增量翻译：把修订后的文档与上一版原文/译文对齐，原文未改动的片段直接沿用上一版译文
+
+上一版译文须由原地翻译生成：它与上一版原文的段落结构相同，片段 id 一一对应。
+"""
+import os
+import re
+import difflib
+
+from .streaming import iter_segments
+
+def _translated_outputs(base_path, target_language):
+    """base_path 已有的输出文件：{文件名}_translated_{语言}.docx 及重名时生成的 _1、_2……"""
+    directory, file_name = os.path.split(base_path)
+    if not os.path.isdir(directory or '.'):
+        return []
+    name, ext = os.path.splitext(file_name)
+    pattern = re.compile(re.escape(f"{name}_translated_{target_language}") + r"(_\d+)?" + re.escape(ext) + "$")
+    return [os.path.join(directory, entry) for entry in os.listdir(directory or '.') if pattern.match(entry)]
+
+def previous_translation_path(file_path, target_language, output_path=None, output_dir=None, previous_source=None):
+    """上一版译文的默认位置，找不到时返回 None
+
+    指定的输出文件已存在时使用该文件；否则在输出位置和上一版原文旁边查找默认输出文件
+    （含重名时加序号的文件），取修改时间最新的一个。
+    """
+    if output_path and os.path.exists(output_path):
+        return output_path
+    base_path = os.path.join(output_dir, os.path.basename(file_path)) if output_dir else file_path
+    candidates = _translated_outputs(base_path, target_language)
+    if previous_source:
+        candidates += _translated_outputs(previous_source, target_language)
+    if not candidates:
+        return None
+    return max(candidates, key=lambda path: (os.path.getmtime(path), path))
+
+def _matching_blocks(old, new):
+    """两个序列中相同的连续区间 [(old 起点, new 起点, 长度)]
+
+    修订通常只改动少数段落，先跳过相同的开头和结尾，只对中间部分做序列比对。
+    """
+    limit = min(len(old), len(new))
+    head = 0
+    while head < limit and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+
+    blocks = [(0, 0, head)]
+    matcher = difflib.SequenceMatcher(None, old[head:len(old) - tail], new[head:len(new) - tail], autojunk=False)
+    blocks.extend((a + head, b + head, size) for a, b, size in matcher.get_matching_blocks())
+    blocks.append((len(old) - tail, len(new) - tail, tail))
+    return blocks
+
+class PreviousVersion:
+    """上一版原文的片段及其译文"""
+    def __init__(self, segments, translations):
+        self.segments = segments          # 上一版原文的片段，按文档顺序
+        self.translations = translations  # 片段 id -> 上一版译文
+
+    @classmethod
+    def load(cls, source_path, translation_path):
+        """读取上一版原文和译文；两者段落结构不一致时抛出 ValueError"""
+        segments = list(iter_segments(source_path))
+        translations = {segment.id: segment.text for segment in iter_segments(translation_path)}
+        # 原地翻译不增删段落，两者的非空段落 id 应完全相同
+        if set(translations) != {segment.id for segment in segments}:
+            raise ValueError(f"{os.path.basename(translation_path)} 与上一版原文的段落结构不一致，"
+                             "无法增量翻译（只支持原地翻译生成的译文）")
+        return cls(segments, translations)
+
+    def _translation(self, segment):
+        """上一版的译文；与原文相同（当时翻译失败或无需翻译）时返回 None"""
+        text = self.translations.get(segment.id)
+        return text if text and text != segment.text else None
+
+    def align(self, segments):
+        """返回 {新片段 id: 上一版译文}
+
+        先按文档顺序对齐两版原文的哈希序列，插入或删除段落后其余片段仍能对应；
+        未对齐但原文在上一版其他位置出现过的片段（如移动过的段落）按哈希沿用。
+        """
+        segments = list(segments)
+        reused = {}
+        for old, new, size in _matching_blocks([segment.hash for segment in self.segments],
+                                               [segment.hash for segment in segments]):
+            for offset in range(size):
+                text = self._translation(self.segments[old + offset])
+                if text is not None:
+                    reused[segments[new + offset].id] = text
+
+        by_hash = {}
+        for segment in self.segments:
+            text = self._translation(segment)
+            if text is not None:
+                by_hash.setdefault(segment.hash, text)
+        for segment in segments:
+            if segment.id not in reused and segment.hash in by_hash:
+                reused[segment.id] = by_hash[segment.hash]
+        return reused
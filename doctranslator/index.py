@@ -0,0 +1,91 @@
+"""一次遍历生成文档中所有可翻译片段的索引，供进度、翻译、缓存和写回共同使用"""
+from docx.oxml.ns import qn
+
+from .cache import SegmentCache
+from .docxtext import W_TXBX_CONTENT, iter_text_parts, iter_paragraphs, paragraph_text
+
+W_TC = qn('w:tc')
+# 兼容旧版 Word 的备用内容：文本框等在 mc:Choice 和 mc:Fallback 中各有一份
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+class Segment:
+    """一个可翻译的段落
+
+    id 由部件名和该段落在部件中的序号（按文档顺序统计所有段落，包括空段落）组成，
+    同一文档每次解析得到的 id 相同，可用于续传和增量翻译。
+    """
+    __slots__ = ('id', 'part', 'ordinal', 'kind', 'text', 'hash')
+
+    def __init__(self, part, ordinal, kind, text):
+        self.id = f"{part}#{ordinal}"
+        self.part = part        # 部件名，如 /word/document.xml
+        self.ordinal = ordinal  # 段落在部件中的序号
+        self.kind = kind        # paragraph / cell / textbox / header / footer / footnote / endnote / comment
+        self.text = text
+        self.hash = SegmentCache.text_hash(text)
+
+    def __repr__(self):
+        return f"Segment({self.id!r}, {self.kind!r}, {self.text[:20]!r})"
+
+class SegmentIndex:
+    """文档的片段索引：segments 按文档顺序排列，paragraphs 为对应的段落元素"""
+    def __init__(self):
+        self.segments = []
+        self.paragraphs = []
+        self._by_element = {}  # 段落元素 -> Segment
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def add(self, segment, paragraph):
+        self.segments.append(segment)
+        self.paragraphs.append(paragraph)
+        self._by_element[paragraph] = segment
+
+    def segment_for(self, paragraph):
+        """返回段落元素对应的片段，空段落返回 None"""
+        return self._by_element.get(paragraph)
+
+    def items(self):
+        """按文档顺序返回 (片段, 段落元素)"""
+        return zip(self.segments, self.paragraphs)
+
+def paragraph_kind(paragraph, default):
+    for ancestor in paragraph.iterancestors():
+        if ancestor.tag == W_TXBX_CONTENT:
+            return 'textbox'
+        if ancestor.tag == W_TC:
+            return 'cell'
+    return default
+
+def is_fallback(paragraph):
+    """段落是否位于 mc:Fallback 中，即同一内容在 mc:Choice 中的备用副本"""
+    return any(ancestor.tag == MC_FALLBACK for ancestor in paragraph.iterancestors())
+
+# 部件名（不含序号和扩展名）-> 其中普通段落的类型
+PART_KINDS = {
+    'header': 'header',
+    'footer': 'footer',
+    'footnotes': 'footnote',
+    'endnotes': 'endnote',
+    'comments': 'comment',
+}
+
+def part_kind(partname):
+    """部件中普通段落的类型"""
+    name = partname.rsplit('/', 1)[-1].split('.', 1)[0].rstrip('0123456789')
+    return PART_KINDS.get(name, 'paragraph')
+
+def build_segment_index(doc):
+    """遍历一次文档的正文、表格、文本框、页眉页脚、脚注、尾注和批注，返回 SegmentIndex"""
+    index = SegmentIndex()
+    for partname, part in iter_text_parts(doc):
+        kind = part_kind(partname)
+        for ordinal, paragraph in enumerate(iter_paragraphs(part.element)):
+            text = paragraph_text(paragraph).strip()
+            if text:
+                index.add(Segment(partname, ordinal, paragraph_kind(paragraph, kind), text), paragraph)
+    return index
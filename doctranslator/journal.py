@@ -0,0 +1,75 @@
+import os
+import json
+import time
+
+class TranslationJournal:
+    """只追加的翻译日志：译文一返回就写入，定期 fsync，进程被杀或断电后可据此续传
+
+    每行一个 JSON 对象 {"id": 片段 id, "hash": 原文哈希, "text": 译文}。
+    """
+    def __init__(self, path, sync_every=None, sync_interval=None):
+        if sync_every is None:
+            sync_every = int(os.getenv('JOURNAL_SYNC_EVERY', '50'))
+        if sync_interval is None:
+            sync_interval = float(os.getenv('JOURNAL_SYNC_INTERVAL', '5'))
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @staticmethod
+    def load(path):
+        """读取日志，返回 {原文哈希: 译文}；忽略崩溃时写了一半的行"""
+        entries = {}
+        if not os.path.exists(path):
+            return entries
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    entries[entry['hash']] = entry['text']
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return entries
+
+    def append(self, segment_id, text_hash, translation):
+        """记录一个片段的译文"""
+        if self._file is None:
+            # 同目录下其他文档完成时可能已删除空的缓存目录
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(
+            {"id": segment_id, "hash": text_hash, "text": translation},
+            ensure_ascii=False
+        ) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """把缓冲区写入磁盘"""
+        if self._file is None or not self._unsynced:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """翻译完成后删除日志"""
+        self.close()
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,247 @@
+"""运行指标：计数器和直方图，可输出为 JSON Lines 日志、Prometheus 文本文件和分阶段耗时报告
+
+各模块通过全局的 metrics 记录指标：
+    metrics.inc('cache_hits')
+    metrics.observe('api_latency_seconds', 0.8, key=1)
+    with metrics.timer('parse_seconds'):
+        ...
+METRICS_LOG 设置时，每个事件追加为一行 JSON；METRICS_PROMETHEUS_FILE 设置时，
+write_prometheus() 以 Prometheus textfile 格式写出当前指标。
+"""
+import os
+import json
+import time
+import threading
+import unicodedata
+from contextlib import contextmanager
+
+# 直方图的桶上限（秒），与 Prometheus 客户端的默认值相近
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float('inf'))
+
+# 分阶段报告中的阶段：(指标名, 显示名称)
+STAGES = (
+    ('parse_seconds', '解析文档'),
+    ('index_seconds', '建立索引'),
+    ('translate_seconds', '翻译（等待 API）'),
+    ('write_seconds', '写入译文'),
+    ('save_seconds', '保存文件'),
+)
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_name(name, labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+def _pad(title, width=20):
+    """按显示宽度（中日韩文字占两列）补齐空格"""
+    display = sum(2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1 for ch in title)
+    return title + " " * max(1, width - display)
+
+def _format_le(bound):
+    return "+Inf" if bound == float('inf') else repr(bound)
+
+class Histogram:
+    """累计分布：各桶计数、总数、总和及最小最大值"""
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.sum / self.count if self.count else None,
+        }
+
+class Metrics:
+    """线程安全的指标集合"""
+    def __init__(self, log_path=None):
+        self._lock = threading.Lock()
+        self.counters = {}    # (名称, 标签) -> 数值
+        self.histograms = {}  # (名称, 标签) -> Histogram
+        self.log_path = log_path if log_path is not None else os.getenv('METRICS_LOG')
+        self._log_file = None
+
+    def configure(self, log_path=None):
+        """设置 JSON Lines 日志文件"""
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+            self.log_path = log_path
+
+    def inc(self, name, value=1, **labels):
+        """计数器加 value"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """向直方图记录一个观测值"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """记录代码块的耗时（秒），并写入一条 stage 日志"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(name, elapsed, **labels)
+            self.log("stage", stage=name, seconds=round(elapsed, 6), **labels)
+
+    def log(self, event, **fields):
+        """追加一条 JSON Lines 日志；未设置日志文件时不做任何事"""
+        if not self.log_path:
+            return
+        line = json.dumps(dict({"ts": round(time.time(), 3), "event": event}, **fields), ensure_ascii=False)
+        with self._lock:
+            if self._log_file is None:
+                directory = os.path.dirname(self.log_path)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory, exist_ok=True)
+                self._log_file = open(self.log_path, 'a', encoding='utf-8')
+            self._log_file.write(line + "\n")
+            self._log_file.flush()
+
+    def counter(self, name, **labels):
+        """返回计数器的值；不指定标签时为所有标签之和"""
+        with self._lock:
+            if labels:
+                return self.counters.get((name, _label_key(labels)), 0)
+            return sum(value for (key, _), value in self.counters.items() if key == name)
+
+    def histogram_total(self, name):
+        """返回某个直方图所有标签合计的 (次数, 总和)"""
+        with self._lock:
+            histograms = [h for (key, _), h in self.histograms.items() if key == name]
+            return sum(h.count for h in histograms), sum(h.sum for h in histograms)
+
+    def snapshot(self):
+        """返回当前所有指标，可直接序列化为 JSON"""
+        with self._lock:
+            return {
+                "counters": {
+                    _format_name(name, labels): value
+                    for (name, labels), value in sorted(self.counters.items())
+                },
+                "histograms": {
+                    _format_name(name, labels): histogram.to_dict()
+                    for (name, labels), histogram in sorted(self.histograms.items())
+                },
+            }
+
+    def prometheus_text(self, prefix="doctranslator_"):
+        """以 Prometheus 文本格式返回当前指标"""
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f"{prefix}{name}_total"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                lines.append(f"{_format_name(metric, labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                metric = prefix + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} histogram")
+                    typed.add(metric)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{_format_name(metric + '_bucket', labels, [('le', _format_le(bound))])} {cumulative}")
+                lines.append(f"{_format_name(metric + '_sum', labels)} {histogram.sum}")
+                lines.append(f"{_format_name(metric + '_count', labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=None):
+        """写出 Prometheus 文本文件（先写临时文件再替换，避免采集到写了一半的文件）"""
+        path = path or os.getenv('METRICS_PROMETHEUS_FILE')
+        if not path:
+            return None
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, path)
+        return path
+
+    def stage_report(self):
+        """按阶段汇总耗时和主要计数，返回可直接打印的文本"""
+        lines = ["分阶段耗时:"]
+        for name, title in STAGES:
+            count, total = self.histogram_total(name)
+            if count:
+                lines.append(f"  {_pad(title)}{total:9.3f} 秒")
+
+        calls, latency = self.histogram_total('api_latency_seconds')
+        if calls:
+            lines.append(f"  {_pad('API 请求累计')}{latency:9.3f} 秒（{calls} 次，平均 {latency / calls:.3f} 秒）")
+            with self._lock:
+                per_key = sorted(
+                    (dict(labels).get('key', '?'), histogram)
+                    for (name, labels), histogram in self.histograms.items()
+                    if name == 'api_latency_seconds'
+                )
+            for key, histogram in per_key:
+                lines.append(f"    key {key}: {histogram.count} 次，平均 {histogram.sum / histogram.count:.3f} 秒，"
+                             f"最长 {histogram.max:.3f} 秒")
+
+        lines.append("计数:")
+        for name, title in (
+            ('segments_indexed', '片段数'),
+            ('segments_skipped', '无需翻译的片段'),
+            ('segments_reused', '沿用上一版译文'),
+            ('cache_hits', '翻译记忆命中'),
+            ('cache_misses', '翻译记忆未命中'),
+            ('api_requests', 'API 请求'),
+            ('retries', '重试'),
+            ('rate_limited', '429 速率限制'),
+            ('api_errors', 'API 错误'),
+            ('tokens_in', '输入 token（估算）'),
+            ('tokens_out', '输出 token（估算）'),
+        ):
+            lines.append(f"  {_pad(title)}{self.counter(name)}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def close(self):
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+# 全局指标
+metrics = Metrics()
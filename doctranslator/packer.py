@@ -0,0 +1,76 @@
+import os
+import re
+
+# 中日韩文字（汉字、假名、谚文）大约每个字符一个 token，其他文字大约每 4 个字符一个 token
+_CJK_RE = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]')
+
+# 每个文本在请求中的额外开销（分隔标记、换行等）
+SEGMENT_OVERHEAD_TOKENS = 8
+
+# 译文 token 数相对原文的粗略倍数，用于估算输出长度
+OUTPUT_TOKEN_RATIOS = {
+    "Chinese": 1.2,
+    "Traditional Chinese": 1.2,
+    "Japanese": 1.5,
+    "Korean": 1.5,
+    "English": 1.2,
+    "Spanish": 1.5,
+    "French": 1.5,
+    "German": 1.5,
+    "Russian": 2.0,
+    "Italian": 1.5
+}
+DEFAULT_OUTPUT_TOKEN_RATIO = 1.5
+
+def estimate_tokens(text):
+    """粗略估算文本的 token 数"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4 + SEGMENT_OVERHEAD_TOKENS
+
+class SegmentPacker:
+    """按估算的 token 数把多个文本打包进一次请求，使每次请求尽量接近输入和输出的 token 上限"""
+    def __init__(self, target_language=None, max_input_tokens=None, max_output_tokens=None):
+        if max_input_tokens is None:
+            max_input_tokens = int(os.getenv('MAX_INPUT_TOKENS', '2000'))
+        if max_output_tokens is None:
+            max_output_tokens = int(os.getenv('MAX_OUTPUT_TOKENS', '4000'))
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.output_ratio = OUTPUT_TOKEN_RATIOS.get(target_language, DEFAULT_OUTPUT_TOKEN_RATIO)
+        # 同时满足输入和输出上限时，一次请求允许的原文 token 数
+        self.token_budget = max(1, min(max_input_tokens, int(max_output_tokens / self.output_ratio)))
+        self.items = []
+        self.tokens = 0  # 当前 items 的估算 token 总数
+
+    def fits(self, tokens):
+        """当前批次是否还能放下指定 token 数的文本"""
+        return self.tokens + tokens <= self.token_budget
+
+    def add(self, item, tokens):
+        """添加一个文本，返回 True 表示当前批次已满应当发送"""
+        self.items.append(item)
+        self.tokens += tokens
+        return self.tokens >= self.token_budget
+
+    def take(self):
+        """取出当前批次并清空"""
+        items = self.items
+        self.items = []
+        self.tokens = 0
+        return items
+
+    def pack(self, texts):
+        """把文本列表按顺序分成若干批，返回每批的下标列表
+
+        超过预算的单个文本单独成批。
+        """
+        batches = []
+        for index, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if self.items and not self.fits(tokens):
+                batches.append(self.take())
+            if self.add(index, tokens):
+                batches.append(self.take())
+        if self.items:
+            batches.append(self.take())
+        return batches
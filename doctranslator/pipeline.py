@@ -0,0 +1,704 @@
+import os
+import time
+import zipfile
+import queue
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from docx import Document
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from .docxtext import W_P, paragraph_text, set_paragraph_text, strip_fields
+from .engine import TranslationEngine
+from .incremental import PreviousVersion, previous_translation_path
+from .index import build_segment_index, is_fallback, part_kind
+from .journal import TranslationJournal
+from .metrics import metrics
+from .packer import SegmentPacker
+from .processor import DocumentProcessor
+from .streaming import iter_segments, write_translations
+from .translator import DocTranslator
+
+W_TBL = qn('w:tbl')
+
+# 重建模式下附在正文之后的内容：(片段筛选条件, 标题)
+APPENDED_CONTENT = (
+    (lambda segment: segment.kind == 'textbox' and segment.part == '/word/document.xml', '【文本框内容】'),
+    (lambda segment: part_kind(segment.part) == 'footnote', '【脚注】'),
+    (lambda segment: part_kind(segment.part) == 'endnote', '【尾注】'),
+    (lambda segment: part_kind(segment.part) == 'comment', '【批注】'),
+)
+
+# 分节的页眉页脚：默认、首页、偶数页
+HEADER_FOOTER_NAMES = ('header', 'first_page_header', 'even_page_header',
+                       'footer', 'first_page_footer', 'even_page_footer')
+
+def get_cache_dir(file_path):
+    """获取文档对应的缓存目录"""
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), ".translation_cache")
+
+def clean_cache(file_path):
+    """清理文档所在目录的所有缓存文件"""
+    try:
+        cache_dir = get_cache_dir(file_path)
+        if os.path.exists(cache_dir):
+            for file in os.listdir(cache_dir):
+                try:
+                    os.remove(os.path.join(cache_dir, file))
+                except:
+                    pass
+            os.rmdir(cache_dir)
+    except:
+        pass
+
+def get_unique_filename(base_path, target_language):
+    """获取唯一的文件名"""
+    dir_path = os.path.dirname(base_path)
+    file_name = os.path.basename(base_path)
+    name, ext = os.path.splitext(file_name)
+
+    # 基础输出文件名
+    base_output = os.path.join(dir_path, f"{name}_translated_{target_language}")
+
+    # 如果文件不存在，直接返回基础名称
+    if not os.path.exists(f"{base_output}{ext}"):
+        return f"{base_output}{ext}"
+
+    # 如果文件存在，添加序号
+    counter = 1
+    while os.path.exists(f"{base_output}_{counter}{ext}"):
+        counter += 1
+
+    return f"{base_output}_{counter}{ext}"
+
+def extract_segments(file_path, streaming=False):
+    """在子进程中解析文档并建立索引，返回 (片段列表, 各阶段耗时)
+
+    片段不含 XML 元素，可以在进程间传递。
+    """
+    start = time.perf_counter()
+    if streaming:
+        segments = list(iter_segments(file_path))
+        return segments, {'parse_seconds': time.perf_counter() - start}
+    doc = Document(file_path)
+    parsed = time.perf_counter()
+    segments = list(build_segment_index(doc))
+    return segments, {'parse_seconds': parsed - start, 'index_seconds': time.perf_counter() - parsed}
+
+def apply_translations(file_path, translations, output_path, streaming=False):
+    """在子进程中重新解析文档，按片段 id 原地写入译文并保存，返回各阶段耗时
+
+    片段 id 由部件名和段落序号组成，重新解析得到的 id 与 extract_segments 一致。
+    """
+    start = time.perf_counter()
+    if streaming:
+        write_translations(file_path, translations, output_path)
+        return {'write_seconds': time.perf_counter() - start}
+    doc = Document(file_path)
+    for segment, paragraph in build_segment_index(doc).items():
+        translated_text = translations.get(segment.id)
+        if translated_text is None:
+            continue
+        if translated_text != segment.text or paragraph_text(paragraph).strip() != segment.text:
+            set_paragraph_text(paragraph, translated_text)
+    written = time.perf_counter()
+    doc.save(output_path)
+    return {'write_seconds': written - start, 'save_seconds': time.perf_counter() - written}
+
+class DocumentJob:
+    """一个待翻译文档的中间状态：源文档、片段索引、新文档以及与片段对应的译文
+
+    原地翻译时 new_doc 为 None，译文直接写回 doc。
+    """
+    def __init__(self, file_path, target_language, doc, index, new_doc, doc_processor,
+                 journal_file, output_path=None, output_dir=None):
+        self.file_path = file_path
+        self.target_language = target_language
+        self.doc = doc
+        self.index = index
+        self.new_doc = new_doc
+        self.doc_processor = doc_processor
+        self.journal_file = journal_file
+        self.journal = None     # TranslationJournal，由 prepare 创建
+        self.output_path = output_path
+        self.output_dir = output_dir
+        self.total_elements = len(index)
+        self.remaining = 0      # 尚未完成的请求数
+
+        # 相同的原文（按规范化哈希判断）只翻译一次，译文分发给所有出现位置
+        self.texts = []         # 去重后的待翻译文本
+        self.hashes = []        # 与 texts 对应的原文哈希
+        self.ids = []           # 与 texts 对应的第一个片段 id
+        self.counts = []        # 每个文本在文档中出现的次数
+        self.positions = {}     # 片段 id -> texts 中的下标
+        by_hash = {}
+        for segment in index:
+            position = by_hash.get(segment.hash)
+            if position is None:
+                position = by_hash[segment.hash] = len(self.texts)
+                self.texts.append(segment.text)
+                self.hashes.append(segment.hash)
+                self.ids.append(segment.id)
+                self.counts.append(0)
+            self.counts[position] += 1
+            self.positions[segment.id] = position
+        self.translations = [None] * len(self.texts)  # 与 texts 对应的译文
+
+    def translation(self, segment):
+        """片段的译文，翻译失败时返回原文"""
+        return self.translations[self.positions[segment.id]] or segment.text
+
+    def translation_map(self):
+        """{片段 id: 译文}，用于按 id 写回（子进程或流式写入）"""
+        return {segment.id: self.translation(segment) for segment in self.index}
+
+class TranslationPipeline:
+    """不依赖图形界面的文档翻译流程，供命令行、图形界面和其他程序调用
+
+    in_place 为 True 时直接替换原文档各段落中的文本后另存（保留版式），
+    为 False 时把译文逐段写入新建的文档（preserve_format 控制是否复制样式）。
+
+    progress_callback(current, total) 在进度变化时调用；
+    idle_callback() 在等待翻译结果期间定期调用；
+    resume_callback(count) 发现未完成的翻译日志时调用（count 为已翻译的片段数），
+    返回 True 表示继续上次的翻译，只发送尚未翻译的片段；返回 False 时删除日志并完整翻译。
+    failures 记录各文档翻译失败（保留原文）的片段数 {源文件路径: 片段数}。
+
+    processes 为批量翻译时解析和保存文档的子进程数（默认读取 DOC_PROCESSES，0 表示不使用子进程）。
+    python-docx 的解析和保存受 GIL 限制，文档较多时由多个进程并行处理，
+    写出已完成的文档也不会阻塞分发翻译请求。仅用于原地翻译模式。
+
+    streaming 为 True 时原地翻译直接流式读写文档 XML，不建立 python-docx 对象树，
+    内存占用与文档大小基本无关；为 None 时大于 STREAMING_THRESHOLD_MB（默认 50）的文档自动使用。
+    """
+    def __init__(self, translator=None, engine=None, preserve_format=True, in_place=True,
+                 progress_callback=None, idle_callback=None, resume_callback=None, processes=None,
+                 streaming=None):
+        self.translator = translator or DocTranslator()
+        self.engine = engine or TranslationEngine(self.translator)
+        self.preserve_format = preserve_format
+        self.in_place = in_place
+        self.progress_callback = progress_callback
+        self.idle_callback = idle_callback
+        self.resume_callback = resume_callback
+        self.failures = {}
+        if processes is None:
+            processes = int(os.getenv('DOC_PROCESSES', '0'))
+        self.processes = max(0, processes)
+        self.streaming = streaming
+        self.streaming_threshold = float(os.getenv('STREAMING_THRESHOLD_MB', '50')) * 1024 * 1024
+
+    def _report_progress(self, current, total):
+        if self.progress_callback:
+            self.progress_callback(current, total)
+
+    def _use_streaming(self, file_path):
+        """是否流式读写该文档（仅原地翻译）"""
+        if not self.in_place:
+            return False
+        if self.streaming is not None:
+            return self.streaming
+        return os.path.isfile(file_path) and os.path.getsize(file_path) > self.streaming_threshold
+
+    def load(self, file_path):
+        """读取文档并一次遍历建立可翻译片段的索引，返回 (doc, index)
+
+        流式读取时 doc 为 None，index 为片段列表。
+        """
+        if self._use_streaming(file_path):
+            # 流式解析同时得到片段，一并计入解析耗时
+            with metrics.timer('parse_seconds'):
+                segments = list(iter_segments(file_path))
+            metrics.inc('segments_indexed', len(segments))
+            return None, segments
+        with metrics.timer('parse_seconds'):
+            doc = Document(file_path)
+        with metrics.timer('index_seconds'):
+            index = build_segment_index(doc)
+        metrics.inc('segments_indexed', len(index))
+        return doc, index
+
+    def load_previous(self, file_path, target_language, previous_source, previous_translation=None,
+                      output_path=None, output_dir=None):
+        """读取增量翻译所用的上一版原文和译文，返回 PreviousVersion；找不到上一版时返回 None
+
+        previous_source 为上一版原文，批量翻译时可以是存放上一版文档（文件名相同）的目录；
+        previous_translation 默认为最新的上一版输出文件（见 previous_translation_path）。
+        上一版译文无法使用（如段落结构不一致）时给出提示并完整翻译。
+        """
+        if os.path.isdir(previous_source):
+            previous_source = os.path.join(previous_source, os.path.basename(file_path))
+        if previous_translation is None:
+            previous_translation = previous_translation_path(file_path, target_language, output_path, output_dir,
+                                                             previous_source)
+        if not (os.path.exists(previous_source) and previous_translation and os.path.exists(previous_translation)):
+            print(f"{os.path.basename(file_path)}: 未找到上一版原文或译文，将完整翻译")
+            return None
+        try:
+            return PreviousVersion.load(previous_source, previous_translation)
+        except (ValueError, zipfile.BadZipFile) as e:
+            print(f"{os.path.basename(file_path)}: {str(e)}，将完整翻译")
+            return None
+
+    def prepare(self, file_path, target_language, output_path=None, output_dir=None, loaded=None,
+                previous=None):
+        """建立某个目标语言的 DocumentJob；loaded 为 load() 的结果，多个语言可共用同一次解析
+
+        previous 为 load_previous() 的结果时进行增量翻译：原文未变的片段沿用上一版译文。
+        """
+        # 创建文档处理器
+        doc_processor = DocumentProcessor(self.translator, target_language)
+
+        # 创建缓存文件路径
+        cache_dir = get_cache_dir(file_path)
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        journal_file = os.path.join(
+            cache_dir,
+            f"{os.path.basename(file_path)}_{target_language}_journal.jsonl"
+        )
+
+        # 进度总数即片段数
+        doc, index = loaded or self.load(file_path)
+        doc_processor.total_elements = len(index)
+
+        new_doc = None if self.in_place else Document()
+        job = DocumentJob(file_path, target_language, doc, index, new_doc, doc_processor,
+                          journal_file, output_path, output_dir)
+
+        # 检查是否存在未完成的翻译：重放日志中原文未变的片段
+        entries = TranslationJournal.load(journal_file)
+        done = [position for position, text_hash in enumerate(job.hashes) if text_hash in entries]
+        if done and self.resume_callback and self.resume_callback(sum(job.counts[i] for i in done)):
+            for position in done:
+                job.translations[position] = entries[job.hashes[position]]
+        elif os.path.exists(journal_file):
+            os.remove(journal_file)
+        job.journal = TranslationJournal(journal_file)
+
+        # 增量翻译：与上一版对齐，原文未变的片段不再发送
+        if previous is not None:
+            reused = set()
+            for segment_id, text in previous.align(index).items():
+                position = job.positions[segment_id]
+                if job.translations[position] is None:
+                    job.translations[position] = text
+                    reused.add(position)
+            metrics.inc('segments_reused', sum(job.counts[i] for i in reused))
+
+        # 数字、编号、网址和已是目标语言的片段不发送，原样保留
+        skipped = 0
+        for position, text in enumerate(job.texts):
+            if job.translations[position] is None and not doc_processor.needs_translation(text):
+                job.translations[position] = text
+                skipped += job.counts[position]
+        metrics.inc('segments_skipped', skipped)
+        return job
+
+    def _dispatch(self, jobs, job_callback=None, on_idle=None):
+        """把多个文档的片段去重、按 token 预算打包后提交到引擎，并把译文分发回每个文档
+
+        相同目标语言下原文相同的片段（包括不同文档中的）只请求一次。
+        批量请求中的每个片段一完成就写入日志并更新进度，不必等待整批返回。
+        job_callback(job) 在某个文档的所有请求都完成时调用；on_idle() 在等待期间定期调用。
+        """
+        start = time.perf_counter()
+        callback_seconds = 0.0  # job_callback（写出文档）的耗时，不计入翻译阶段
+        groups = {}    # (目标语言, 原文哈希) -> [(job, 下标)]
+        requests = {}  # 目标语言 -> [((目标语言, 原文哈希), 原文)]
+        completed = 0
+        for job in jobs:
+            job.remaining = 0
+            for position, text in enumerate(job.texts):
+                if job.translations[position] is not None:
+                    # 已从翻译日志中恢复
+                    completed += job.counts[position]
+                    continue
+                key = (job.target_language, job.hashes[position])
+                if key not in groups:
+                    groups[key] = []
+                    requests.setdefault(job.target_language, []).append((key, text))
+                groups[key].append((job, position))
+
+        total = sum(job.total_elements for job in jobs)
+        self._report_progress(completed, total)
+
+        # 各目标语言的请求交替提交，使多个语言同时推进
+        packed = [
+            [(target_language, [items[i] for i in batch])
+             for batch in SegmentPacker(target_language).pack([text for _, text in items])]
+            for target_language, items in requests.items()
+        ]
+        # 工作线程通过队列上报已完成的片段，由调用线程写入日志和更新进度
+        updates = queue.Queue()
+        batches = []    # 批次序号 -> 该批的 (目标语言, 原文哈希) 列表
+        committed = []  # 批次序号 -> 已提交的批内下标
+        futures = {}
+        for round_batches in itertools.zip_longest(*packed):
+            for entry in round_batches:
+                if entry is None:
+                    continue
+                target_language, batch = entry
+                keys = [key for key, _ in batch]
+                batch_no = len(batches)
+                batches.append(keys)
+                committed.append(set())
+                future = self.engine.submit_batch(
+                    [text for _, text in batch], target_language,
+                    on_segment=lambda i, text, batch_no=batch_no: updates.put((batch_no, i, text))
+                )
+                futures[future] = batch_no
+                for job in dict.fromkeys(job for key in keys for job, _ in groups[key]):
+                    job.remaining += 1
+
+        metrics.inc('segments_unique', len(groups))
+
+        def finish_job(job):
+            nonlocal callback_seconds
+            mark = time.perf_counter()
+            job_callback(job)
+            callback_seconds += time.perf_counter() - mark
+
+        if job_callback:
+            for job in jobs:
+                if job.remaining == 0:
+                    # 没有需要翻译的内容，直接写出
+                    finish_job(job)
+
+        def commit(batch_no, i, translated_text):
+            nonlocal completed
+            if i in committed[batch_no]:
+                return
+            committed[batch_no].add(i)
+            for job, position in groups[batches[batch_no][i]]:
+                job.translations[position] = translated_text
+                completed += job.counts[position]
+                # 译文一返回就写入日志，中断后可续传
+                if translated_text:
+                    job.journal.append(job.ids[position], job.hashes[position], translated_text)
+
+        def drain():
+            count = completed
+            while True:
+                try:
+                    commit(*updates.get_nowait())
+                except queue.Empty:
+                    break
+            if completed != count:
+                self._report_progress(completed, total)
+
+        def idle():
+            drain()
+            if on_idle:
+                on_idle()
+            if self.idle_callback:
+                self.idle_callback()
+
+        try:
+            for future in self.engine.iter_completed(futures, idle):
+                batch_no = futures[future]
+                result = future.result()
+                drain()
+                for i, translated_text in enumerate(result):
+                    commit(batch_no, i, translated_text)
+                self._report_progress(completed, total)
+                touched = dict.fromkeys(job for key in batches[batch_no] for job, _ in groups[key])
+                for job in touched:
+                    job.remaining -= 1
+                    if job.remaining == 0 and job_callback:
+                        finish_job(job)
+        finally:
+            for job in jobs:
+                job.journal.close()
+            if self.translator.cache:
+                self.translator.cache.flush()
+            metrics.observe('translate_seconds', time.perf_counter() - start - callback_seconds)
+
+    def _output_path(self, job):
+        """确定输出文件路径"""
+        if job.output_path:
+            return job.output_path
+        base_path = job.file_path
+        if job.output_dir:
+            base_path = os.path.join(job.output_dir, os.path.basename(job.file_path))
+        return get_unique_filename(base_path, job.target_language)
+
+    def _remove_job_cache(self, job):
+        """删除本文档的翻译日志（同目录下其他文档的缓存保留）
+
+        有片段翻译失败时保留日志，再次翻译并选择继续上次的翻译时只需重试这些片段。
+        """
+        failed = sum(job.counts[i] for i, text in enumerate(job.translations) if text is None)
+        if failed:
+            self.failures[job.file_path] = self.failures.get(job.file_path, 0) + failed
+            print(f"{os.path.basename(job.file_path)}: {failed} 个片段翻译失败，已保留原文；"
+                  "翻译日志已保留，再次翻译时选择继续上次的翻译（命令行使用 --resume）将只重试这些片段")
+            job.journal.close()
+            return
+        job.journal.remove()
+        try:
+            os.rmdir(os.path.dirname(job.journal_file))
+        except OSError:
+            pass
+
+    def finish(self, job):
+        """写入译文并保存，返回输出路径"""
+        if job.doc is None:
+            # 流式写入：边解析边写出，写入和保存合为一步
+            output_path = self._output_path(job)
+            with metrics.timer('write_seconds'):
+                write_translations(job.file_path, job.translation_map(), output_path)
+            job.doc_processor.processed_elements = job.total_elements
+            self._remove_job_cache(job)
+            return output_path
+
+        with metrics.timer('write_seconds'):
+            if job.new_doc is None:
+                output_doc = self._finish_in_place(job)
+            else:
+                output_doc = self._finish_rebuild(job)
+
+        output_path = self._output_path(job)
+        with metrics.timer('save_seconds'):
+            output_doc.save(output_path)
+        self._remove_job_cache(job)
+        return output_path
+
+    def _finish_in_place(self, job):
+        """原地替换各段落的文本，返回要保存的文档
+
+        多个语言共用同一次解析时依次写入：每次都会覆盖所有片段，因此不会残留其他语言的译文。
+        """
+        for segment, paragraph in job.index.items():
+            translated_text = job.translation(segment)
+            # 原样保留的片段不改动，保留各个 run 的格式
+            if translated_text != segment.text or paragraph_text(paragraph).strip() != segment.text:
+                set_paragraph_text(paragraph, translated_text)
+            job.doc_processor.processed_elements += 1
+        return job.doc
+
+    def _finish_rebuild(self, job):
+        """把译文按文档顺序写入新文档，文本框、脚注、尾注和批注附在正文之后，并写入页眉页脚，返回新文档
+
+        新文档不保留域（页码等），译文中的域标记直接去掉。
+        """
+        doc_processor = job.doc_processor
+        new_doc = job.new_doc
+        index = job.index
+        # 按文档顺序写入新文档
+        for element in job.doc.element.body:
+            if element.tag == W_P:
+                segment = index.segment_for(element)
+                if segment is None:
+                    new_doc.add_paragraph()
+                    continue
+                new_para = new_doc.add_paragraph()
+                if self.preserve_format:
+                    try:
+                        # 复制原始段落的样式
+                        new_para.style = Paragraph(element, job.doc._body).style
+                    except:
+                        pass
+                new_para.text = strip_fields(job.translation(segment))
+                doc_processor.processed_elements += 1
+
+            elif element.tag == W_TBL:
+                try:
+                    source_table = Table(element, job.doc._body)
+                    cell_contents = doc_processor.collect_table_cells(source_table, index)
+                    doc_processor.write_table(
+                        source_table,
+                        new_doc,
+                        cell_contents,
+                        ["\n".join(strip_fields(job.translation(segment)) for segment in cell['segments'])
+                         for cell in cell_contents],
+                        self.preserve_format
+                    )
+                except Exception as table_error:
+                    print(f"处理表格时出错: {str(table_error)}")
+                    new_doc.add_paragraph("【表格处理失败】")
+
+        # 文本框、脚注、尾注和批注附在正文之后；mc:Fallback 中的副本与 mc:Choice 相同，只写一次
+        for selected, title in APPENDED_CONTENT:
+            segments = [segment for segment, paragraph in index.items()
+                        if selected(segment) and not is_fallback(paragraph)]
+            if not segments:
+                continue
+            new_doc.add_paragraph('─' * 50)
+            new_doc.add_paragraph(title)
+            for segment in segments:
+                new_doc.add_paragraph(strip_fields(job.translation(segment)))
+                doc_processor.processed_elements += 1
+            new_doc.add_paragraph('─' * 50)
+
+        # 写入页眉页脚（新文档只有一个分节，使用第一个分节的默认、首页和偶数页页眉页脚）
+        if job.doc.sections:
+            section = job.doc.sections[0]
+            new_section = new_doc.sections[0]
+            new_section.different_first_page_header_footer = section.different_first_page_header_footer
+            new_doc.settings.odd_and_even_pages_header_footer = job.doc.settings.odd_and_even_pages_header_footer
+            for name in HEADER_FOOTER_NAMES:
+                source = getattr(section, name)
+                if source.is_linked_to_previous:
+                    # 没有单独定义，访问其段落会在源文档中新建部件
+                    continue
+                target = getattr(new_section, name)
+                translated = [strip_fields(job.translation(segment))
+                              for segment in map(index.segment_for, (p._p for p in source.paragraphs))
+                              if segment is not None]
+                for i, text in enumerate(translated):
+                    if i < len(target.paragraphs):
+                        target.paragraphs[i].text = text
+                    else:
+                        target.add_paragraph(text)
+                    doc_processor.processed_elements += 1
+        return new_doc
+
+    def translate_file(self, file_path, target_language, output_path=None,
+                       previous_source=None, previous_translation=None):
+        """翻译一个 Word 文档并返回输出文件路径
+
+        指定 previous_source（上一版原文）时进行增量翻译，见 load_previous()。
+        """
+        previous = None
+        if previous_source:
+            previous = self.load_previous(file_path, target_language, previous_source,
+                                          previous_translation, output_path)
+        job = self.prepare(file_path, target_language, output_path, previous=previous)
+
+        # 用并发引擎同时发送所有请求
+        self._dispatch([job])
+
+        output_path = self.finish(job)
+        self._report_progress(job.total_elements, job.total_elements)
+        return output_path
+
+    def translate_batch(self, file_paths, target_language, output_dir=None, file_callback=None,
+                        previous_source=None):
+        """批量翻译多个文档
+
+        target_language 可以是一个语言，也可以是多个语言的列表：每个文档只解析一次，
+        所有文档、所有语言的待翻译文本去重后进入同一个引擎队列，
+        某个文档某个语言的最后一段译文返回后立即写出该文件。
+        file_callback(file_path, output_path, error) 在每个输出文件完成或失败时调用。
+        previous_source 为存放上一版原文的目录时进行增量翻译，上一版译文为输出目录中的默认输出文件。
+        单个语言时返回 {源文件路径: 输出路径或异常}，多个语言时返回 {(源文件路径, 语言): 输出路径或异常}。
+        """
+        multiple = not isinstance(target_language, str)
+        target_languages = list(target_language) if multiple else [target_language]
+        results = {}
+
+        def report_file(file_path, language, output_path, error):
+            results[(file_path, language) if multiple else file_path] = error if error else output_path
+            if file_callback:
+                file_callback(file_path, output_path, error)
+
+        def finish_job(job):
+            try:
+                report_file(job.file_path, job.target_language, self.finish(job), None)
+            except Exception as e:
+                report_file(job.file_path, job.target_language, None, e)
+
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        pool = None
+        if self.processes and self.in_place and len(file_paths) > 1:
+            # 使用 spawn 启动子进程，避免 fork 时复制引擎线程的状态
+            pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            jobs = self._prepare_batch(file_paths, target_languages, output_dir, pool, report_file,
+                                       previous_source)
+            if pool is None:
+                self._dispatch(jobs, finish_job)
+            else:
+                self._dispatch_with_pool(jobs, pool, report_file)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return results
+
+    def _prepare_batch(self, file_paths, target_languages, output_dir, pool, report_file, previous_source=None):
+        """读取所有文档（每个文档只解析一次）并为每个语言建立 DocumentJob
+
+        指定进程池时由多个子进程同时解析，此时 job.doc 为 None，job.index 为片段列表。
+        """
+        if pool is not None:
+            loading = [(file_path, pool.submit(extract_segments, file_path, self._use_streaming(file_path)))
+                       for file_path in file_paths]
+        else:
+            loading = [(file_path, None) for file_path in file_paths]
+
+        jobs = []
+        for file_path, future in loading:
+            try:
+                if future is None:
+                    loaded = self.load(file_path)
+                else:
+                    segments, timings = future.result()
+                    for name, seconds in timings.items():
+                        metrics.observe(name, seconds)
+                    metrics.inc('segments_indexed', len(segments))
+                    loaded = (None, segments)
+            except Exception as e:
+                for language in target_languages:
+                    report_file(file_path, language, None, e)
+                continue
+            for language in target_languages:
+                try:
+                    previous = None
+                    if previous_source:
+                        previous = self.load_previous(file_path, language, previous_source, output_dir=output_dir)
+                    jobs.append(self.prepare(file_path, language, output_dir=output_dir, loaded=loaded,
+                                             previous=previous))
+                except Exception as e:
+                    report_file(file_path, language, None, e)
+        return jobs
+
+    def _reserve_output(self, job):
+        """确定输出路径并先创建空文件占位，使并行保存的文档不会选中同一个文件名"""
+        output_path = self._output_path(job)
+        if not job.output_path:
+            open(output_path, 'a').close()
+        return output_path
+
+    def _dispatch_with_pool(self, jobs, pool, report_file):
+        """分发翻译请求；每个文档的译文齐全后交给子进程写入并保存，不阻塞分发"""
+        saving = {}  # Future -> (job, 输出路径)
+
+        def finish_job(job):
+            try:
+                output_path = self._reserve_output(job)
+                future = pool.submit(apply_translations, job.file_path, job.translation_map(), output_path,
+                                     self._use_streaming(job.file_path))
+                saving[future] = (job, output_path)
+            except Exception as e:
+                report_file(job.file_path, job.target_language, None, e)
+
+        def collect(done):
+            for future in done:
+                job, output_path = saving.pop(future)
+                try:
+                    for name, seconds in future.result().items():
+                        metrics.observe(name, seconds)
+                    job.doc_processor.processed_elements = job.total_elements
+                    self._remove_job_cache(job)
+                    report_file(job.file_path, job.target_language, output_path, None)
+                except Exception as e:
+                    # 删除占位的空文件
+                    if not job.output_path and os.path.exists(output_path) and not os.path.getsize(output_path):
+                        os.remove(output_path)
+                    report_file(job.file_path, job.target_language, None, e)
+
+        self._dispatch(jobs, finish_job, on_idle=lambda: collect([f for f in list(saving) if f.done()]))
+        while saving:
+            done, _ = wait(list(saving), return_when=FIRST_COMPLETED)
+            collect(done)
+
+    def translate_languages(self, file_path, target_languages, output_dir=None, file_callback=None):
+        """把一个文档同时翻译成多个语言（只解析一次），返回 {语言: 输出路径或异常}"""
+        results = self.translate_batch([file_path], list(target_languages), output_dir, file_callback)
+        return {language: result for (_, language), result in results.items()}
@@ -0,0 +1,87 @@
+import os
+from docx.oxml import parse_xml
+
+from .classifier import needs_translation
+from .index import build_segment_index
+
+class DocumentProcessor:
+    def __init__(self, translator, target_language=None):
+        self.translator = translator
+        self.target_language = target_language
+        self.processed_elements = 0
+        self.total_elements = 0
+        # 发送前跳过数字、编号、网址和已是目标语言的文本，SKIP_UNTRANSLATABLE=False 时关闭
+        self.skip_untranslatable = os.getenv('SKIP_UNTRANSLATABLE', 'True').lower() not in ('false', '0', 'no')
+
+    def needs_translation(self, text):
+        """片段是否需要翻译；不需要的片段原样保留"""
+        if not self.skip_untranslatable or self.target_language is None:
+            return True
+        return needs_translation(text, self.target_language)
+
+    def count_translatable_elements(self, doc):
+        """计算文档中可翻译元素（非空段落，包括单元格、文本框、页眉页脚、脚注、尾注和批注中的段落）的总数"""
+        return len(build_segment_index(doc))
+
+    def collect_table_cells(self, source_table, index=None):
+        """收集表格中需要翻译的单元格，返回 [{'text', 'row', 'col', 'segments'}] 列表
+
+        合并单元格只收集一次；传入片段索引时，segments 为单元格内各段落对应的片段。
+        """
+        cell_contents = []
+        seen = set()
+        for i, row in enumerate(source_table.rows):
+            for j, cell in enumerate(row.cells):
+                if cell._tc in seen:
+                    continue
+                seen.add(cell._tc)
+                if index is not None:
+                    segments = [segment for segment in map(index.segment_for, (p._p for p in cell.paragraphs))
+                                if segment is not None]
+                    text = "\n".join(segment.text for segment in segments)
+                else:
+                    segments = []
+                    text = cell.text.strip()
+                if text:
+                    cell_contents.append({
+                        'text': text,
+                        'row': i,
+                        'col': j,
+                        'segments': segments
+                    })
+        return cell_contents
+
+    def write_table(self, source_table, new_doc, cell_contents, translations, preserve_format=True):
+        """根据翻译结果在新文档中写入表格，translations 与 cell_contents 一一对应"""
+        try:
+            rows = len(source_table.rows)
+            cols = len(source_table.columns) if source_table.columns else len(source_table.rows[0].cells)
+            
+            # 在当前位置添加表格
+            new_table = new_doc.add_table(rows=rows, cols=cols)
+            new_table._element.append(parse_xml(r'<w:tblGrid xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"/>'))
+            
+            if preserve_format:
+                try:
+                    new_table.style = source_table.style
+                except:
+                    pass
+
+            # 如果没有需要翻译的内容，直接返回
+            if not cell_contents:
+                return
+            
+            # 填充翻译后的表格，没有译文时使用原文
+            for cell, translated_text in zip(cell_contents, translations):
+                new_table.cell(cell['row'], cell['col']).text = translated_text or cell['text']
+                self.processed_elements += 1
+
+            # 添加一个空段落来分隔表格
+            new_doc.add_paragraph()
+                    
+        except Exception as e:
+            print(f"处理表格时出错: {str(e)}")
+            # 如果表格处理失败，添加错误信息
+            new_doc.add_paragraph("【表格处理失败，原始内容如下】")
+            for cell in cell_contents:
+                new_doc.add_paragraph(f"行{cell['row']+1}列{cell['col']+1}: {cell['text']}")
@@ -0,0 +1,158 @@
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+class TokenBucket:
+    """令牌桶：按固定速率补充令牌，最多积累 capacity 个"""
+    def __init__(self, rate, capacity):
+        self.rate = rate  # 每秒补充的令牌数
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now):
+        """尝试取走一个令牌，成功返回 0，否则返回需要等待的秒数"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+class KeyState:
+    """单个 API key 的健康状态"""
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.cooldown_until = 0.0  # 冷却结束时间（time.monotonic）
+        self.rate_limited = 0      # 连续触发速率限制的次数
+        self.disabled = False      # 认证失败等原因被停用
+
+def backoff_delay(attempt, base=None, cap=60.0):
+    """带随机抖动的指数退避时间（full jitter）"""
+    if base is None:
+        base = float(os.getenv('RETRY_BASE_DELAY', '1'))
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def parse_retry_after(error):
+    """从 API 异常的响应头中读取 Retry-After（秒），没有时返回 None"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or getattr(error, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RateLimiter:
+    """为每个 API key 维护令牌桶和健康状态，决定下一个请求使用哪个 key
+
+    默认速率来自 API 文档中每个 key 每小时 1200 次请求的限制。
+    """
+    def __init__(self, key_count, requests_per_hour=None, burst=None):
+        if requests_per_hour is None:
+            requests_per_hour = float(os.getenv('REQUESTS_PER_HOUR', '1200'))
+        if burst is None:
+            burst = float(os.getenv('RATE_LIMIT_BURST', '5'))
+        self.keys = [
+            KeyState(TokenBucket(requests_per_hour / 3600.0, burst))
+            for _ in range(key_count)
+        ]
+        # 可选的并发控制器（见 AIMDController），设置后只选择并发窗口未满的 key
+        self.concurrency = None
+        self._lock = threading.Lock()
+
+    def _available_in(self, state, now):
+        """该 key 还需等待多少秒才能发送请求（不取走令牌）"""
+        wait = max(0.0, state.cooldown_until - now)
+        state.bucket._refill(now)
+        if state.bucket.tokens < 1:
+            wait = max(wait, (1 - state.bucket.tokens) / state.bucket.rate)
+        return wait
+
+    def acquire(self, preferred=None):
+        """阻塞直到某个 key 可以发送请求，返回该 key 的下标
+
+        优先使用 preferred；所有 key 都被停用时抛出 RuntimeError。
+        请求结束后必须调用 release()。
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                order = list(range(len(self.keys)))
+                if preferred is not None:
+                    order.remove(preferred)
+                    order.insert(0, preferred)
+
+                wait = None
+                for index in order:
+                    state = self.keys[index]
+                    if state.disabled:
+                        continue
+                    if self.concurrency and not self.concurrency.has_capacity(index):
+                        # 并发窗口已满，等待进行中的请求结束
+                        wait = 0.05 if wait is None else min(wait, 0.05)
+                        continue
+                    if state.cooldown_until <= now and state.bucket.try_take(now) == 0:
+                        if self.concurrency:
+                            self.concurrency.try_acquire(index)
+                        return index
+                    key_wait = self._available_in(state, now)
+                    wait = key_wait if wait is None else min(wait, key_wait)
+
+                if wait is None:
+                    raise RuntimeError("所有 API key 均已停用，请检查 .env 中的 API key 配置")
+            time.sleep(min(max(wait, 0.01), 1.0))
+
+    def release(self, index):
+        """请求结束，释放并发窗口中的位置"""
+        if self.concurrency:
+            self.concurrency.release(index)
+
+    def report_success(self, index, latency=None):
+        with self._lock:
+            self.keys[index].rate_limited = 0
+        if self.concurrency and latency is not None:
+            self.concurrency.on_success(index, latency)
+
+    def report_error(self, index):
+        """记录超时、连接错误或 5xx 错误"""
+        if self.concurrency:
+            self.concurrency.on_overload(index)
+
+    def report_rate_limited(self, index, retry_after=None):
+        """记录速率限制：按 Retry-After 或指数退避让该 key 冷却"""
+        with self._lock:
+            state = self.keys[index]
+            state.rate_limited += 1
+            if retry_after is None:
+                retry_after = backoff_delay(state.rate_limited)
+            state.cooldown_until = max(state.cooldown_until, time.monotonic() + retry_after)
+            # 冷却期间不再积累突发令牌
+            state.bucket.tokens = 0
+        if self.concurrency:
+            self.concurrency.on_overload(index)
+        return retry_after
+
+    def disable(self, index):
+        """停用认证失败的 key"""
+        with self._lock:
+            self.keys[index].disabled = True
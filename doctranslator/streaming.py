@@ -0,0 +1,116 @@
+"""流式读写大文档：直接从 zip 中逐块解析正文、页眉页脚、脚注、尾注和批注的 XML，不建立 python-docx 对象树
+
+正文的每个块级元素（段落、表格等）解析完成后立即处理并释放，内存占用只与最大的单个块有关，
+与文档大小基本无关。片段 id 与 build_segment_index 相同（部件名 + 段落在部件中的序号），
+两种方式得到的片段、翻译日志和翻译记忆可以互相使用。
+"""
+import shutil
+import zipfile
+from lxml import etree
+from docx.oxml.ns import qn
+
+from .docxtext import TEXT_PART_RE, iter_paragraphs, paragraph_text, set_paragraph_text
+from .index import Segment, part_kind, paragraph_kind
+
+W_BODY = qn('w:body')
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+
+def text_part_names(archive):
+    """zip 中包含可翻译文本的部件名，顺序与 iter_text_parts 相同（正文在前，其余按名称排序）"""
+    names = ['/' + name for name in archive.namelist() if TEXT_PART_RE.match('/' + name)]
+    names.sort(key=lambda name: (name != '/word/document.xml', name))
+    return names
+
+def _iter_part(stream):
+    """流式解析一个部件，依次返回 ('start', 外层元素)、('block', 块级元素)、('end', 外层元素)
+
+    外层元素为根元素和 w:body；块级元素完整解析后返回，调用方处理完后即被清除。
+    """
+    depth = 0
+    wrappers = []
+    for event, element in etree.iterparse(stream, events=('start', 'end'), huge_tree=True):
+        if event == 'start':
+            if depth == 0 or (depth == 1 and element.tag == W_BODY):
+                wrappers.append(element)
+                yield 'start', element
+            depth += 1
+            continue
+
+        depth -= 1
+        if wrappers and element is wrappers[-1]:
+            wrappers.pop()
+            yield 'end', element
+        elif depth == len(wrappers):
+            yield 'block', element
+            element.clear()
+            element.getparent().remove(element)
+
+def iter_segments(file_path):
+    """逐个返回文档中的可翻译片段（Segment），不加载整个文档"""
+    with zipfile.ZipFile(file_path) as archive:
+        for partname in text_part_names(archive):
+            kind = part_kind(partname)
+            ordinal = 0
+            with archive.open(partname[1:]) as stream:
+                for event, element in _iter_part(stream):
+                    if event != 'block':
+                        continue
+                    for paragraph in iter_paragraphs(element):
+                        text = paragraph_text(paragraph).strip()
+                        if text:
+                            yield Segment(partname, ordinal, paragraph_kind(paragraph, kind), text)
+                        ordinal += 1
+
+def _strip_declarations(data, inherited):
+    """去掉开始标签中与外层相同的命名空间声明，避免每个块都重复声明"""
+    end = data.index(b'>')
+    head = data[:end]
+    for prefix, uri in inherited.items():
+        name = 'xmlns' if prefix is None else 'xmlns:' + prefix
+        head = head.replace(f' {name}="{uri}"'.encode('utf-8'), b'', 1)
+    return head + data[end:]
+
+def _open_tag(element):
+    shell = etree.Element(element.tag, dict(element.attrib), nsmap=element.nsmap)
+    return etree.tostring(shell)[:-2] + b'>'
+
+def _close_tag(element):
+    name = etree.QName(element).localname
+    return f'</{element.prefix}:{name}>'.encode('utf-8') if element.prefix else f'</{name}>'.encode('utf-8')
+
+def _patch_part(source, target, partname, translations):
+    """流式改写一个部件：逐块写入译文后立即输出"""
+    target.write(XML_DECLARATION)
+    scopes = [{}]  # 外层元素已声明的命名空间
+    ordinal = 0
+    for event, element in _iter_part(source):
+        if event == 'start':
+            target.write(_strip_declarations(_open_tag(element), scopes[-1]))
+            scopes.append(element.nsmap)
+        elif event == 'end':
+            scopes.pop()
+            target.write(_close_tag(element))
+        else:
+            for paragraph in iter_paragraphs(element):
+                translated_text = translations.get(f"{partname}#{ordinal}")
+                # 原样保留的片段不改动，保留各个 run 的格式
+                if translated_text is not None and translated_text != paragraph_text(paragraph).strip():
+                    set_paragraph_text(paragraph, translated_text)
+                ordinal += 1
+            target.write(_strip_declarations(etree.tostring(element, with_tail=False), scopes[-1]))
+
+def write_translations(file_path, translations, output_path):
+    """把译文 {片段 id: 译文} 写入文档副本：文本部件流式改写，其余部件原样复制"""
+    with zipfile.ZipFile(file_path) as source, \
+            zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            entry = zipfile.ZipInfo(info.filename, info.date_time)
+            entry.compress_type = zipfile.ZIP_DEFLATED
+            entry.external_attr = info.external_attr
+            partname = '/' + info.filename
+            with source.open(info) as src, target.open(entry, 'w') as dst:
+                if TEXT_PART_RE.match(partname):
+                    _patch_part(src, dst, partname, translations)
+                else:
+                    shutil.copyfileobj(src, dst)
+    return output_path
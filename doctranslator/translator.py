@@ -0,0 +1,359 @@
+import os
+import json
+import time
+from dotenv import load_dotenv
+
+from .backends import create_backends
+from .cache import SegmentCache
+from .glossary import load_glossaries, format_terms, terms_digest
+from .metrics import metrics
+from .packer import estimate_tokens
+from .ratelimit import RateLimiter, backoff_delay, parse_retry_after
+
+# 加载环境变量
+load_dotenv()
+
+# 支持的语言：界面显示名称 -> 提示词中使用的语言名称
+SUPPORTED_LANGUAGES = {
+    "简体中文": "Chinese",
+    "繁體中文": "Traditional Chinese",
+    "日本語": "Japanese",
+    "English": "English",
+    "Español": "Spanish",
+    "Français": "French",
+    "Deutsch": "German",
+    "한국어": "Korean",
+    "Русский": "Russian",
+    "Italiano": "Italian"
+}
+
+# 批量翻译协议：输入和输出都是 [{"id": ..., "text": ...}] 形式的 JSON 数组
+BATCH_INSTRUCTIONS = (
+    'The input is a JSON array of objects with "id" and "text" fields. '
+    'Translate only the "text" values and reply with nothing but a JSON array '
+    'containing the same objects with the same "id" values. '
+    'Markers such as ⟦1⟧ stand for fields like page numbers: keep each one unchanged '
+    'and in the position the surrounding translation requires.'
+)
+# 批量结果缺项时重新请求缺失部分的最大次数
+MAX_BATCH_RETRIES = 2
+
+def parse_batch_response(response, expected_ids):
+    """解析批量翻译返回的 JSON 数组，返回 {id: 译文}，忽略多余、重复或格式错误的项"""
+    if not response:
+        return {}
+    # 去掉模型可能添加的代码块标记和说明文字
+    start = response.find('[')
+    end = response.rfind(']')
+    if start < 0 or end <= start:
+        return {}
+    try:
+        items = json.loads(response[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    expected = set(expected_ids)
+    translations = {}
+    for item in items:
+        item_id, text = _valid_item(item, expected, translations)
+        if item_id is not None:
+            translations[item_id] = text
+    return translations
+
+def _valid_item(item, expected, seen):
+    """校验批量结果中的一项，合法时返回 (id, 译文)，否则返回 (None, None)"""
+    if not isinstance(item, dict):
+        return None, None
+    item_id = str(item.get("id"))
+    text = item.get("text")
+    if item_id in expected and item_id not in seen and isinstance(text, str) and text.strip():
+        return item_id, text.strip()
+    return None, None
+
+class StreamingBatchParser:
+    """增量解析流式返回的 JSON 数组：每当一个 {"id", "text"} 对象闭合，立即回调 on_item(id, 译文)
+
+    这样批量请求中已完成的片段无需等待整个响应结束即可写入，
+    连接中途断开时已收到的片段也不会丢失。
+    """
+    def __init__(self, expected_ids, on_item):
+        self.expected = set(expected_ids)
+        self.seen = set()
+        self.on_item = on_item
+        self._started = False  # 是否已读到数组的 '['
+        self._depth = 0        # 当前对象的花括号嵌套层数
+        self._in_string = False
+        self._escape = False
+        self._buffer = []
+
+    def feed(self, chunk):
+        for ch in chunk:
+            if not self._started:
+                # 跳过代码块标记等数组之前的内容
+                if ch == '[':
+                    self._started = True
+                continue
+            if self._depth == 0:
+                if ch == '{':
+                    self._depth = 1
+                    self._buffer = [ch]
+                continue
+            self._buffer.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                self._depth += 1
+            elif ch == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit("".join(self._buffer))
+
+    def _emit(self, raw):
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            return
+        item_id, text = _valid_item(item, self.expected, self.seen)
+        if item_id is not None:
+            self.seen.add(item_id)
+            self.on_item(item_id, text)
+
+class DocTranslator:
+    def __init__(self, cache=None, backends=None, glossaries=None):
+        # 每个 API key 对应一个后端；未指定时按 TRANSLATION_BACKEND 创建
+        if backends is None:
+            backends = create_backends()
+        if not backends:
+            raise ValueError("没有可用的翻译后端")
+        self.backends = list(backends)
+        
+        # 翻译记忆以模型名区分译文
+        self.model = self.backends[0].model
+        
+        # 每个 key 的限流和健康状态，以及单个请求的最大重试次数
+        self.rate_limiter = RateLimiter(len(self.backends))
+        self.max_retries = int(os.getenv('MAX_RETRIES', '5'))
+        # 批量请求使用流式响应，逐个提交已完成的片段
+        self.stream = os.getenv('STREAM_RESPONSES', 'True').lower() not in ('false', '0', 'no')
+        
+        # 翻译记忆，CACHE_ENABLED=False 时关闭
+        if cache is None and os.getenv('CACHE_ENABLED', 'True').lower() not in ('false', '0', 'no'):
+            try:
+                cache = SegmentCache()
+            except Exception as e:
+                print(f"无法打开翻译记忆: {str(e)}")
+        self.cache = cache
+        
+        # 术语表 {目标语言: Glossary}，键 None 表示适用于所有语言；默认读取 GLOSSARY_PATH
+        if glossaries is None and os.getenv('GLOSSARY_PATH'):
+            try:
+                glossaries = load_glossaries(os.getenv('GLOSSARY_PATH'))
+            except Exception as e:
+                print(f"无法读取术语表: {str(e)}")
+        self.glossaries = glossaries or {}
+        
+        # 支持的语言字典
+        self.supported_languages = SUPPORTED_LANGUAGES
+    
+    def match_terms(self, text, target_language):
+        """返回文本中出现的术语 [(原文术语, 译文)]"""
+        glossary = self.glossaries.get(target_language) or self.glossaries.get(None)
+        if not glossary:
+            return []
+        return glossary.match(text)
+
+    def _memory_model(self, terms):
+        """翻译记忆中使用的模型名：用到术语的片段附加术语的哈希"""
+        if not terms:
+            return self.model
+        return f"{self.model}#glossary:{terms_digest(terms)}"
+
+    def translate_batch(self, texts, target_language, client_index=None, on_segment=None):
+        """在一次请求中翻译多个文本，返回与输入顺序一致的译文列表（失败的项为 None）
+
+        多个文本以带 id 的 JSON 数组发送，返回结果按 id 校验；
+        缺失或格式错误的项会单独重新请求，而不是重发整批。
+        on_segment(index, translated_text) 在每个片段完成时（于工作线程中）立即调用，
+        开启流式响应时不必等待整批返回。
+        每次请求只附带本次发送的文本中出现的术语。
+        """
+        results = [None] * len(texts)
+        terms = [self.match_terms(text, target_language) for text in texts]
+        models = [self._memory_model(text_terms) for text_terms in terms]
+
+        def commit(i, translated_text):
+            if results[i] is not None or not translated_text:
+                return
+            results[i] = translated_text
+            if self.cache:
+                self.cache.put(texts[i], target_language, models[i], translated_text)
+            if on_segment:
+                on_segment(i, translated_text)
+
+        # 只发送翻译记忆中没有的文本
+        missing = []
+        for i, text in enumerate(texts):
+            cached = self.cache.get(text, target_language, models[i]) if self.cache else None
+            if cached is not None:
+                results[i] = cached
+                if on_segment:
+                    on_segment(i, cached)
+            else:
+                missing.append(i)
+
+        for attempt in range(MAX_BATCH_RETRIES + 1):
+            if not missing:
+                break
+            batch_terms = list(dict.fromkeys(term for i in missing for term in terms[i]))
+            glossary = format_terms(batch_terms) if batch_terms else None
+            if len(missing) == 1:
+                # 只剩一个文本时直接发送原文，无需 JSON 格式
+                i = missing[0]
+                translations = {i: self._request(texts[i], target_language, client_index, instructions=glossary)}
+            else:
+                translations = self._request_json({i: texts[i] for i in missing}, target_language, client_index,
+                                                  commit, glossary)
+
+            for i, translated_text in translations.items():
+                commit(i, translated_text)
+            still_missing = [i for i in missing if results[i] is None]
+            if still_missing and attempt < MAX_BATCH_RETRIES:
+                print(f"批量翻译缺少 {len(still_missing)}/{len(missing)} 项，重新请求缺失的部分")
+            missing = still_missing
+        return results
+
+    def _request_json(self, items, target_language, client_index=None, on_item=None, glossary=None):
+        """以 JSON 数组发送 {id: 原文}，返回通过校验的 {id: 译文}
+
+        开启流式响应时，每个对象一闭合就调用 on_item(id, 译文)。
+        glossary 为附加在系统提示词中的术语说明。
+        """
+        payload = json.dumps(
+            [{"id": str(i), "text": text} for i, text in items.items()],
+            ensure_ascii=False
+        )
+        on_delta = None
+        if self.stream and on_item:
+            on_delta = StreamingBatchParser(
+                [str(i) for i in items],
+                lambda item_id, text: on_item(int(item_id), text)
+            ).feed
+        instructions = f"{BATCH_INSTRUCTIONS} {glossary}" if glossary else BATCH_INSTRUCTIONS
+        response = self._request(payload, target_language, client_index, instructions=instructions, on_delta=on_delta)
+        return {int(key): value for key, value in parse_batch_response(response, [str(i) for i in items]).items()}
+
+    def _request(self, text, target_language, client_index=None, instructions=None, on_delta=None):
+        """发送一次翻译请求，失败时按退避策略重试，最终失败返回 None
+
+        client_index 为首选的 API key，不可用时由限流器选择其他 key。
+        所有 key 都被停用时抛出 RuntimeError。
+        指定 on_delta 时使用流式响应，每收到一段内容就调用 on_delta(内容)；
+        流在中途断开时返回已收到的部分，由调用方只重新请求缺失的片段。
+        """
+        # 使用选定的客户端发送请求
+        if target_language == "English":
+            prompt = f"Please translate the following text to English, maintaining professionalism and accuracy:\n\n{text}"
+        elif target_language == "Japanese":
+            prompt = f"以下のテキストを日本語に翻訳してください。専門性と正確性を保ちながら翻訳してください：\n\n{text}"
+        else:
+            prompt = f"请将以下文本翻译成{target_language}，保持专业性和准确性：\n\n{text}"
+
+        system_prompt = f"You are a professional translator. Translate the text to {target_language} without adding any additional information or explanations."
+        if instructions:
+            system_prompt = f"{system_prompt} {instructions}"
+
+        for attempt in range(self.max_retries + 1):
+            # 等待令牌桶放行
+            client_index = self.rate_limiter.acquire(client_index)
+            acquired = client_index
+            received = []
+            delay = 0
+            if attempt:
+                metrics.inc('retries')
+            start = time.perf_counter()
+            try:
+                messages = [
+                    {
+                        "role": "system",
+                        "content": system_prompt
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ]
+                backend = self.backends[client_index]
+                metrics.inc('api_requests', key=client_index + 1)
+                if on_delta is None:
+                    content = backend.complete(messages)
+                else:
+                    for delta in backend.stream(messages):
+                        received.append(delta)
+                        on_delta(delta)
+                    content = "".join(received)
+                self.rate_limiter.report_success(client_index, time.perf_counter() - start)
+                self._record_call(client_index, start, messages, content, attempt)
+                return content
+
+            except Exception as e:
+                status = getattr(e, 'status_code', None)
+                metrics.observe('api_latency_seconds', time.perf_counter() - start, key=client_index + 1)
+                if received:
+                    # 已完成的片段已经提交，缺失的部分由调用方重新请求
+                    print(f"流式响应中断，保留已收到的内容: {str(e)}")
+                    self.rate_limiter.report_error(client_index)
+                    metrics.inc('api_errors', key=client_index + 1)
+                    metrics.log("api_error", key=client_index + 1, status=status, error=str(e), partial=True)
+                    return "".join(received)
+                if status == 429 or (status is None and "429" in str(e)):
+                    metrics.inc('rate_limited', key=client_index + 1)
+                    cooldown = self.rate_limiter.report_rate_limited(client_index, parse_retry_after(e))
+                    metrics.log("rate_limited", key=client_index + 1, cooldown=round(cooldown, 3))
+                    print(f"API Key {client_index + 1} 触发速率限制，冷却 {cooldown:.1f} 秒并切换到其他 key...")
+                    # 由限流器选择下一个可用的 key，无需额外等待
+                    client_index = None
+                    continue
+                if status in (401, 403):
+                    print(f"API Key {client_index + 1} 认证失败，已停用: {str(e)}")
+                    self.rate_limiter.disable(client_index)
+                    client_index = None
+                    continue
+                print(f"翻译出错: {str(e)}")
+                metrics.inc('api_errors', key=client_index + 1)
+                metrics.log("api_error", key=client_index + 1, status=status, error=str(e))
+                if status is not None and 400 <= status < 500:
+                    # 请求本身有误，重试没有意义
+                    return None
+                # 超时、连接错误和 5xx 错误按指数退避重试
+                self.rate_limiter.report_error(client_index)
+                if attempt < self.max_retries:
+                    delay = backoff_delay(attempt)
+            finally:
+                self.rate_limiter.release(acquired)
+            # 退避期间不占用并发窗口
+            if delay:
+                time.sleep(delay)
+
+        print(f"翻译失败：已重试 {self.max_retries} 次")
+        metrics.inc('api_failures')
+        return None
+
+    def _record_call(self, client_index, start, messages, content, attempt):
+        """记录一次成功请求的耗时和（估算的）token 数"""
+        latency = time.perf_counter() - start
+        tokens_in = sum(estimate_tokens(message["content"]) for message in messages)
+        tokens_out = estimate_tokens(content or "")
+        metrics.observe('api_latency_seconds', latency, key=client_index + 1)
+        metrics.inc('tokens_in', tokens_in)
+        metrics.inc('tokens_out', tokens_out)
+        metrics.log("api_call", key=client_index + 1, seconds=round(latency, 6),
+                    tokens_in=tokens_in, tokens_out=tokens_out, attempt=attempt)
@@ -3,11 +3,21 @@ from setuptools import setup, find_packages
 setup(
     name="doctranslator",
     version="1.0.0",
-    packages=find_packages(),
+    packages=find_packages(exclude=("tests", "tests.*")),
+    py_modules=['translate_docx'],
     install_requires=[
+        'python-dotenv>=0.19.0',
         'openai>=1.0.0',
         'python-docx>=0.8.11',
     ],
+    entry_points={
+        'console_scripts': [
+            'translate-docx=doctranslator.cli:main',
+        ],
+        'gui_scripts': [
+            'translate-docx-gui=doctranslator.gui:main',
+        ],
+    },
     author="Suyao Yong",
     author_email="suhunter@163.com",
     description="A multi-language document translator using Grok API",
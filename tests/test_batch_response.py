@@ -0,0 +1,23 @@
+from doctranslator.translator import parse_batch_response
+
+def test_parses_array():
+    response = '[{"id": "0", "text": "Bonjour"}, {"id": "1", "text": "Monde"}]'
+    assert parse_batch_response(response, ["0", "1"]) == {"0": "Bonjour", "1": "Monde"}
+
+def test_ignores_code_fence_and_commentary():
+    response = 'Here you go:\n```json\n[{"id": "0", "text": "Bonjour"}]\n```'
+    assert parse_batch_response(response, ["0"]) == {"0": "Bonjour"}
+
+def test_drops_unexpected_duplicate_and_empty_items():
+    response = ('[{"id": "0", "text": "Bonjour"}, {"id": "0", "text": "Salut"}, '
+                '{"id": "7", "text": "Extra"}, {"id": "1", "text": "  "}, {"id": "2"}, "stray"]')
+    assert parse_batch_response(response, ["0", "1", "2"]) == {"0": "Bonjour"}
+
+def test_numeric_ids_are_accepted():
+    assert parse_batch_response('[{"id": 3, "text": "Trois"}]', ["3"]) == {"3": "Trois"}
+
+def test_invalid_responses():
+    assert parse_batch_response(None, ["0"]) == {}
+    assert parse_batch_response("no json here", ["0"]) == {}
+    assert parse_batch_response('[{"id": "0", "text": "Bon', ["0"]) == {}
+    assert parse_batch_response('{"id": "0", "text": "Bonjour"}', ["0"]) == {}
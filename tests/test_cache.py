@@ -0,0 +1,35 @@
+from doctranslator.cache import SegmentCache
+
+def test_hash_ignores_surrounding_whitespace_and_repeated_spaces():
+    assert SegmentCache.text_hash("  A  B ") == SegmentCache.text_hash("A B")
+
+def test_hash_keeps_tabs_and_line_breaks():
+    assert SegmentCache.text_hash("A\tB") != SegmentCache.text_hash("A B")
+    assert SegmentCache.text_hash("A\nB") != SegmentCache.text_hash("A B")
+    assert SegmentCache.text_hash("A\tB") != SegmentCache.text_hash("A\nB")
+
+def test_hash_unicode_normalization():
+    assert SegmentCache.text_hash("Cafe\u0301") == SegmentCache.text_hash("Caf\u00e9")
+
+def test_memory_round_trip(tmp_path):
+    path = str(tmp_path / "memory.db")
+    cache = SegmentCache(path)
+    assert cache.get("Hello", "French", "model") is None
+    cache.put("Hello", "French", "model", "Bonjour")
+    assert cache.get("Hello ", "French", "model") == "Bonjour"
+    assert cache.get("Hello", "French", "other-model") is None
+    assert cache.get("Hello", "German", "model") is None
+    cache.close()
+
+    # 关闭时提交，重新打开后仍然存在
+    cache = SegmentCache(path)
+    assert cache.get("Hello", "French", "model") == "Bonjour"
+    cache.close()
+
+def test_tab_and_space_variants_are_stored_separately(tmp_path):
+    cache = SegmentCache(str(tmp_path / "memory.db"))
+    cache.put("Name\tValue", "French", "model", "Nom\tValeur")
+    cache.put("Name Value", "French", "model", "Nom Valeur")
+    assert cache.get("Name\tValue", "French", "model") == "Nom\tValeur"
+    assert cache.get("Name Value", "French", "model") == "Nom Valeur"
+    cache.close()
@@ -0,0 +1,55 @@
+import pytest
+
+from doctranslator.classifier import chinese_variant, is_untranslatable, needs_translation
+
+@pytest.mark.parametrize("text", [
+    "12,345.67",
+    "2024-03-21",
+    "—",
+    "https://example.com/docs",
+    "support@example.com",
+    "/usr/local/bin",
+    "AB-1234",
+    "v2.3.1",
+    "config_value",
+    "⟦1⟧",
+])
+def test_untranslatable(text):
+    assert is_untranslatable(text)
+    assert not needs_translation(text, "French")
+
+@pytest.mark.parametrize("text", ["Figure-1", "Page ⟦1⟧ of ⟦2⟧", "Total"])
+def test_translatable_text(text):
+    assert needs_translation(text, "French")
+
+@pytest.mark.parametrize("text, target_language", [
+    ("这是一个简体中文的句子。", "Chinese"),
+    ("這是繁體中文句子。", "Traditional Chinese"),
+    ("これは日本語の文章です。", "Japanese"),
+    ("이것은 한국어 문장입니다.", "Korean"),
+    ("Это предложение на русском языке.", "Russian"),
+    ("Le contrat est signé par les deux parties et la date est fixée.", "French"),
+    ("The contract is signed by both parties and the date is fixed.", "English"),
+])
+def test_already_in_target_language(text, target_language):
+    assert not needs_translation(text, target_language)
+
+@pytest.mark.parametrize("text, target_language", [
+    ("这是一个简体中文的句子，需要翻译成繁体。", "Traditional Chinese"),
+    ("這是繁體中文句子。", "Chinese"),
+    ("東京都渋谷区", "Chinese"),
+    ("東京都渋谷区", "Traditional Chinese"),
+    ("中文", "Chinese"),
+    ("これは日本語の文章です。", "Chinese"),
+    ("The contract is signed by both parties and the date is fixed.", "French"),
+    ("Contract terms", "English"),
+])
+def test_needs_translation(text, target_language):
+    assert needs_translation(text, target_language)
+
+def test_chinese_variant():
+    assert chinese_variant("简体字") == "Chinese"
+    assert chinese_variant("簡體字") == "Traditional Chinese"
+    assert chinese_variant("简體") is None
+    assert chinese_variant("中文") is None
+    assert chinese_variant("渋谷") is None
@@ -0,0 +1,124 @@
+from docx import Document
+from docx.oxml import parse_xml
+
+from doctranslator.docxtext import W_T, paragraph_text, set_paragraph_text, strip_fields
+from doctranslator.index import build_segment_index
+from doctranslator.pipeline import apply_translations
+
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+PAGE_FIELD = (
+    '<w:r><w:fldChar w:fldCharType="begin"/></w:r>'
+    '<w:r><w:instrText xml:space="preserve"> PAGE </w:instrText></w:r>'
+    '<w:r><w:fldChar w:fldCharType="separate"/></w:r>'
+    '<w:r><w:t>1</w:t></w:r>'
+    '<w:r><w:fldChar w:fldCharType="end"/></w:r>'
+)
+NUMPAGES_FIELD = '<w:fldSimple w:instr=" NUMPAGES "><w:r><w:rPr><w:b/></w:rPr><w:t>5</w:t></w:r></w:fldSimple>'
+PAGE_FOOTER = (
+    '<w:r><w:t xml:space="preserve">Page </w:t></w:r>' + PAGE_FIELD +
+    '<w:r><w:t xml:space="preserve"> of </w:t></w:r>' + NUMPAGES_FIELD
+)
+
+def make_paragraph(body):
+    return parse_xml(f'<w:p {W_NS}>{body}</w:p>')
+
+def texts(paragraph):
+    return [node.text for node in paragraph.iter(W_T)]
+
+def test_plain_paragraph_round_trip():
+    paragraph = make_paragraph('<w:r><w:t>Hello </w:t></w:r><w:r><w:rPr><w:b/></w:rPr><w:t>world</w:t></w:r>')
+    assert paragraph_text(paragraph) == "Hello world"
+    assert set_paragraph_text(paragraph, "Bonjour le monde")
+    assert paragraph_text(paragraph) == "Bonjour le monde"
+
+def test_tabs_and_breaks_round_trip():
+    paragraph = make_paragraph('<w:r><w:t>A</w:t><w:tab/><w:t>B</w:t><w:br/><w:t>C</w:t></w:r>')
+    assert paragraph_text(paragraph) == "A\tB\nC"
+    set_paragraph_text(paragraph, "X\tY\nZ")
+    assert paragraph_text(paragraph) == "X\tY\nZ"
+
+def test_page_break_is_not_text():
+    paragraph = make_paragraph('<w:r><w:t>Before</w:t><w:br w:type="page"/><w:t>After</w:t></w:r>')
+    assert paragraph_text(paragraph) == "BeforeAfter"
+    set_paragraph_text(paragraph, "Translated")
+    assert paragraph.find('.//{*}br') is not None
+
+def test_leading_tab_kept_after_stripped_translation():
+    paragraph = make_paragraph('<w:r><w:tab/><w:t>Indented clause text here.</w:t></w:r>')
+    segment_text = paragraph_text(paragraph).strip()
+    assert segment_text == "Indented clause text here."
+    set_paragraph_text(paragraph, "[译] " + segment_text)
+    assert paragraph_text(paragraph) == "\t[译] Indented clause text here."
+
+def test_trailing_break_kept_after_stripped_translation():
+    paragraph = make_paragraph('<w:r><w:t>Line</w:t><w:br/></w:r>')
+    set_paragraph_text(paragraph, "Ligne")
+    assert paragraph_text(paragraph) == "Ligne\n"
+
+def test_fields_are_markers_and_results_are_not_read():
+    paragraph = make_paragraph(PAGE_FOOTER)
+    assert paragraph_text(paragraph) == "Page ⟦1⟧ of ⟦2⟧"
+
+def test_field_results_untouched_when_writing():
+    paragraph = make_paragraph(PAGE_FOOTER)
+    set_paragraph_text(paragraph, "第 ⟦1⟧ 页，共 ⟦2⟧ 页")
+    assert paragraph_text(paragraph) == "第 ⟦1⟧ 页，共 ⟦2⟧ 页"
+    # 域代码和域结果保持原样
+    assert paragraph.find('.//{*}instrText').text == " PAGE "
+    assert texts(paragraph) == ["第 ", "1", " 页，共 ", "5", " 页"]
+    # 最后一个域之后新建的 run 沿用普通文本的格式，而不是域结果的加粗
+    assert paragraph[-1].find('{*}rPr') is None
+
+def test_text_before_first_field():
+    paragraph = make_paragraph(PAGE_FIELD + '<w:r><w:t xml:space="preserve"> / total</w:t></w:r>')
+    assert paragraph_text(paragraph) == "⟦1⟧ / total"
+    set_paragraph_text(paragraph, "Seite ⟦1⟧ / gesamt")
+    assert paragraph_text(paragraph) == "Seite ⟦1⟧ / gesamt"
+    assert texts(paragraph) == ["Seite ", "1", " / gesamt"]
+
+def test_lost_markers_keep_fields():
+    paragraph = make_paragraph(PAGE_FOOTER)
+    set_paragraph_text(paragraph, "第页，共页")
+    assert paragraph_text(paragraph) == "第页，共页⟦1⟧⟦2⟧"
+    assert texts(paragraph) == ["第页，共页", "1", "5"]
+
+def test_field_continuing_into_next_paragraph():
+    paragraph = make_paragraph(
+        '<w:r><w:t xml:space="preserve">Contents </w:t></w:r>'
+        '<w:r><w:fldChar w:fldCharType="begin"/></w:r>'
+        '<w:r><w:instrText> TOC </w:instrText></w:r>'
+        '<w:r><w:fldChar w:fldCharType="separate"/></w:r>'
+        '<w:r><w:t>Chapter 1</w:t></w:r>'
+    )
+    assert paragraph_text(paragraph) == "Contents ⟦1⟧"
+    set_paragraph_text(paragraph, "Sommaire ⟦1⟧")
+    assert texts(paragraph) == ["Sommaire ", "Chapter 1"]
+
+def test_strip_fields():
+    assert strip_fields("Page ⟦1⟧ of ⟦2⟧") == "Page  of "
+
+def make_footer_document(path):
+    doc = Document()
+    doc.add_paragraph("Body text")
+    doc.add_paragraph().add_run("\tIndented clause text here.")
+    footer = doc.sections[0].footer.paragraphs[0]._p
+    for child in make_paragraph(PAGE_FOOTER):
+        footer.append(child)
+    doc.save(path)
+
+def translate_all(path, output_path, streaming):
+    translations = {segment.id: "[译] " + segment.text for segment in build_segment_index(Document(path))}
+    apply_translations(str(path), translations, str(output_path), streaming=streaming)
+    return Document(output_path)
+
+def test_document_round_trip_keeps_fields_and_indentation(tmp_path):
+    source = tmp_path / "source.docx"
+    make_footer_document(source)
+    for streaming in (False, True):
+        output = translate_all(source, tmp_path / f"out_{streaming}.docx", streaming)
+        footer = output.sections[0].footer.paragraphs[0]._p
+        assert paragraph_text(footer) == "[译] Page ⟦1⟧ of ⟦2⟧"
+        assert footer.find('.//{*}instrText').text == " PAGE "
+        assert footer.find('.//{*}fldSimple') is not None
+        assert output.paragraphs[1].text == "\t[译] Indented clause text here."
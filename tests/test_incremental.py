@@ -0,0 +1,84 @@
+import os
+
+from docx import Document
+
+from doctranslator.backends import FakeBackend
+from doctranslator.incremental import PreviousVersion, previous_translation_path
+from doctranslator.index import Segment
+from doctranslator.pipeline import TranslationPipeline
+from doctranslator.translator import DocTranslator
+
+PART = "/word/document.xml"
+
+def segments(*texts):
+    return [Segment(PART, ordinal, 'paragraph', text) for ordinal, text in enumerate(texts)]
+
+def previous(*texts):
+    old = segments(*texts)
+    return PreviousVersion(old, {segment.id: f"<{segment.text}>" for segment in old})
+
+def test_unchanged_document_reuses_everything():
+    version = previous("A", "B", "C")
+    assert version.align(segments("A", "B", "C")) == {f"{PART}#0": "<A>", f"{PART}#1": "<B>", f"{PART}#2": "<C>"}
+
+def test_inserted_and_edited_paragraphs_are_not_reused():
+    version = previous("A", "B", "C", "D")
+    reused = version.align(segments("New", "A", "B changed", "C", "D"))
+    assert reused == {f"{PART}#1": "<A>", f"{PART}#3": "<C>", f"{PART}#4": "<D>"}
+
+def test_deleted_paragraph_keeps_the_rest_aligned():
+    version = previous("A", "B", "C")
+    assert version.align(segments("A", "C")) == {f"{PART}#0": "<A>", f"{PART}#1": "<C>"}
+
+def test_moved_paragraph_reused_by_hash():
+    version = previous("A", "B", "C")
+    assert version.align(segments("C", "A", "B")) == {f"{PART}#0": "<C>", f"{PART}#1": "<A>", f"{PART}#2": "<B>"}
+
+def test_untranslated_previous_segments_are_not_reused():
+    old = segments("A", "B")
+    # B 上次翻译失败，译文与原文相同
+    version = PreviousVersion(old, {old[0].id: "<A>", old[1].id: "B"})
+    assert version.align(segments("A", "B")) == {f"{PART}#0": "<A>"}
+
+def touch(path, mtime):
+    with open(path, 'w') as f:
+        f.write("")
+    os.utime(path, (mtime, mtime))
+
+def test_previous_translation_is_newest_numbered_output(tmp_path):
+    file_path = str(tmp_path / "spec.docx")
+    touch(str(tmp_path / "spec_translated_Japanese.docx"), 1000)
+    touch(str(tmp_path / "spec_translated_Japanese_1.docx"), 2000)
+    touch(str(tmp_path / "spec_translated_French_2.docx"), 3000)
+    touch(str(tmp_path / "spec_translated_Japanese_draft.docx"), 4000)
+    assert previous_translation_path(file_path, "Japanese") == str(tmp_path / "spec_translated_Japanese_1.docx")
+
+def test_previous_translation_next_to_previous_source(tmp_path):
+    archive = tmp_path / "archive"
+    archive.mkdir()
+    touch(str(archive / "spec_v1_translated_Japanese.docx"), 1000)
+    found = previous_translation_path(str(tmp_path / "spec_v2.docx"), "Japanese",
+                                      previous_source=str(archive / "spec_v1.docx"))
+    assert found == str(archive / "spec_v1_translated_Japanese.docx")
+
+def test_previous_translation_prefers_existing_output_path(tmp_path):
+    output_path = str(tmp_path / "custom.docx")
+    touch(output_path, 1000)
+    touch(str(tmp_path / "spec_translated_Japanese.docx"), 2000)
+    assert previous_translation_path(str(tmp_path / "spec.docx"), "Japanese", output_path) == output_path
+
+def test_previous_translation_missing(tmp_path):
+    assert previous_translation_path(str(tmp_path / "spec.docx"), "Japanese") is None
+
+def test_mismatched_previous_translation_falls_back_to_full_translation(tmp_path, monkeypatch):
+    monkeypatch.setenv('CACHE_ENABLED', 'False')
+    source = str(tmp_path / "v1.docx")
+    translation = str(tmp_path / "v1_ja.docx")
+    for path, texts in ((source, ["A", "B"]), (translation, ["<A>"])):
+        doc = Document()
+        for text in texts:
+            doc.add_paragraph(text)
+        doc.save(path)
+    pipeline = TranslationPipeline(DocTranslator(backends=[FakeBackend(latency=0)]))
+    assert pipeline.load_previous(str(tmp_path / "v2.docx"), "Japanese", source, translation) is None
+    assert isinstance(pipeline.load_previous(str(tmp_path / "v2.docx"), "Japanese", source, source), PreviousVersion)
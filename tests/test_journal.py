@@ -0,0 +1,64 @@
+import os
+
+from docx import Document
+
+from doctranslator.backends import FakeBackend
+from doctranslator.cache import SegmentCache
+from doctranslator.journal import TranslationJournal
+from doctranslator.pipeline import TranslationPipeline, get_cache_dir
+from doctranslator.translator import DocTranslator
+
+def test_load_ignores_partial_line(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = TranslationJournal(path, sync_every=1)
+    journal.append("/word/document.xml#0", "hash-a", "Bonjour")
+    journal.append("/word/document.xml#1", "hash-b", "Monde")
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"id": "/word/document.xml#2", "hash": "hash-c", "te')
+    assert TranslationJournal.load(path) == {"hash-a": "Bonjour", "hash-b": "Monde"}
+
+def test_load_missing_journal(tmp_path):
+    assert TranslationJournal.load(str(tmp_path / "missing.jsonl")) == {}
+
+def make_document(path):
+    doc = Document()
+    for text in ("First paragraph.", "Second paragraph.", "Third paragraph."):
+        doc.add_paragraph(text)
+    doc.save(path)
+
+def write_journal(file_path, target_language, entries):
+    path = os.path.join(get_cache_dir(file_path), f"{os.path.basename(file_path)}_{target_language}_journal.jsonl")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    journal = TranslationJournal(path)
+    for text, translation in entries.items():
+        journal.append("", SegmentCache.text_hash(text), translation)
+    journal.close()
+    return path
+
+def translate(file_path, resume, monkeypatch):
+    monkeypatch.setenv('CACHE_ENABLED', 'False')
+    monkeypatch.setenv('REQUESTS_PER_HOUR', '3600000')
+    counts = []
+    translator = DocTranslator(backends=[FakeBackend(latency=0)])
+    pipeline = TranslationPipeline(translator, resume_callback=lambda count: counts.append(count) or resume)
+    output_path = pipeline.translate_file(file_path, "French")
+    pipeline.engine.close()
+    return [p.text for p in Document(output_path).paragraphs], counts
+
+def test_resume_replays_journal(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "doc.docx")
+    make_document(file_path)
+    journal_path = write_journal(file_path, "French", {"Second paragraph.": "Deuxième paragraphe."})
+    texts, counts = translate(file_path, True, monkeypatch)
+    assert counts == [1]
+    assert texts == ["[French] First paragraph.", "Deuxième paragraphe.", "[French] Third paragraph."]
+    assert not os.path.exists(journal_path)
+
+def test_declined_resume_translates_everything(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "doc.docx")
+    make_document(file_path)
+    write_journal(file_path, "French", {"Second paragraph.": "Deuxième paragraphe."})
+    texts, counts = translate(file_path, False, monkeypatch)
+    assert counts == [1]
+    assert texts == ["[French] First paragraph.", "[French] Second paragraph.", "[French] Third paragraph."]
@@ -0,0 +1,49 @@
+from docx import Document
+from docx.oxml import parse_xml
+
+from doctranslator.backends import FakeBackend
+from doctranslator.pipeline import TranslationPipeline
+from doctranslator.translator import DocTranslator
+
+TEXTBOX_RUN = (
+    '<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:v="urn:schemas-microsoft-com:vml">'
+    '<mc:AlternateContent>'
+    '<mc:Choice Requires="wps"><w:pict><v:shape><v:textbox><w:txbxContent>'
+    '<w:p><w:r><w:t>Text box content</w:t></w:r></w:p>'
+    '</w:txbxContent></v:textbox></v:shape></w:pict></mc:Choice>'
+    '<mc:Fallback><w:pict><v:shape><v:textbox><w:txbxContent>'
+    '<w:p><w:r><w:t>Text box content</w:t></w:r></w:p>'
+    '</w:txbxContent></v:textbox></v:shape></w:pict></mc:Fallback>'
+    '</mc:AlternateContent></w:r>'
+)
+
+def make_textbox_document(path):
+    doc = Document()
+    doc.add_paragraph("Body text")
+    doc.add_paragraph()._p.append(parse_xml(TEXTBOX_RUN))
+    doc.save(path)
+
+def translate(file_path, monkeypatch, in_place):
+    monkeypatch.setenv('CACHE_ENABLED', 'False')
+    monkeypatch.setenv('REQUESTS_PER_HOUR', '3600000')
+    translator = DocTranslator(backends=[FakeBackend(latency=0)])
+    pipeline = TranslationPipeline(translator, in_place=in_place)
+    output_path = pipeline.translate_file(file_path, "French")
+    pipeline.engine.close()
+    return Document(output_path)
+
+def test_rebuild_appends_alternate_content_textbox_once(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "textbox.docx")
+    make_textbox_document(file_path)
+    texts = [p.text for p in translate(file_path, monkeypatch, in_place=False).paragraphs]
+    assert texts.count("[French] Text box content") == 1
+    assert "【文本框内容】" in texts
+
+def test_in_place_translates_both_alternate_content_copies(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "textbox.docx")
+    make_textbox_document(file_path)
+    body = translate(file_path, monkeypatch, in_place=True).element.body
+    texts = [t.text for t in body.iter('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}t')]
+    assert texts == ["[French] Body text", "[French] Text box content", "[French] Text box content"]
@@ -0,0 +1,33 @@
+from doctranslator.translator import StreamingBatchParser
+
+def parse(chunks, expected_ids):
+    items = []
+    parser = StreamingBatchParser(expected_ids, lambda item_id, text: items.append((item_id, text)))
+    for chunk in chunks:
+        parser.feed(chunk)
+    return items
+
+RESPONSE = '```json\n[{"id": "0", "text": "Bonjour {le} \\"monde\\""}, {"id": "1", "text": "Fin ]"}]\n```'
+
+def test_items_emitted_as_soon_as_they_close():
+    items = []
+    parser = StreamingBatchParser(["0", "1"], lambda item_id, text: items.append(item_id))
+    parser.feed('[{"id": "0", "text": "Bonjour"}')
+    assert items == ["0"]
+    parser.feed(', {"id": "1", "te')
+    assert items == ["0"]
+    parser.feed('xt": "Monde"}]')
+    assert items == ["0", "1"]
+
+def test_chunk_boundaries_do_not_matter():
+    expected = [("0", 'Bonjour {le} "monde"'), ("1", "Fin ]")]
+    assert parse([RESPONSE], ["0", "1"]) == expected
+    assert parse(list(RESPONSE), ["0", "1"]) == expected
+
+def test_unexpected_duplicate_and_empty_items_are_skipped():
+    response = ('[{"id": "0", "text": "Un"}, {"id": "0", "text": "Encore"}, '
+                '{"id": "9", "text": "Extra"}, {"id": "1", "text": ""}]')
+    assert parse([response], ["0", "1"]) == [("0", "Un")]
+
+def test_truncated_stream_keeps_completed_items():
+    assert parse(['[{"id": "0", "text": "Un"}, {"id": "1", "text": "De'], ["0", "1"]) == [("0", "Un")]
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=['doctranslator.gui'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],